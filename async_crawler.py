@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from parsers.index_parser import *
+from parsers.news_parser import *
+
+from pandas import DataFrame
+
+from typing import Union, Iterable
+from http import HTTPStatus
+from random import uniform
+from warnings import warn
+from asyncio import run, gather, ensure_future, get_running_loop, sleep, Semaphore, TimeoutError
+from concurrent.futures import Executor
+from aiohttp import ClientSession, ClientTimeout, ClientError, TCPConnector
+from requests.exceptions import RetryError
+
+
+class AsyncCrawler:
+    """
+    asyncio based crawler, pages are fetched concurrently (with a global concurrency limit)
+    and parsed in an executor, a page failed is skipped (like Crawler in CrawlTask)
+    """
+
+    URL_INDEX = Crawler.URL_INDEX
+
+    COLUMNS = Crawler.COLUMNS
+
+    # the statuses retried after backoff, the same as Crawler
+    RETRY_STATUSES = Crawler.RETRY_STATUSES
+    _retryable = classmethod(Crawler._retryable.__func__)
+
+    MAX_BACKOFF = Crawler.MAX_BACKOFF
+
+    def __init__(self, strict: bool = False, retry: int = 3, timeout: Union[tuple, float] = None,
+                 concurrency: int = 16, executor: Executor = None, backoff: float = 0.5):
+        """
+        initialization for crawler
+        :param strict: should parse DOM nodes in strict mode?
+        :param retry: retry times
+        :param timeout: seconds timeout for connect & read buffer
+        :param concurrency: max number of requests in flight
+        :param executor: the executor to parse pages in (the default executor of event loop if None)
+        :param backoff: base seconds of the exponential backoff between retries
+        """
+
+        if isinstance(timeout, tuple):
+            timeout = ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            timeout = ClientTimeout(total=timeout)
+
+        self._strict = strict
+        self._retry = retry
+        self._timeout = timeout
+        self._concurrency = concurrency
+        self._executor = executor
+        self._backoff = backoff
+        self._session = None
+        self._semaphore = None
+
+    def crawl(self, start_page: int = 1, n: int = -1) -> DataFrame:
+        """
+        start the crawler (see Crawler.crawl)
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        """
+
+        return run(self.crawl_async(start_page, n))
+
+    async def crawl_async(self, start_page: int = 1, n: int = -1) -> DataFrame:
+        """
+        start the crawler in the running event loop
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        """
+
+        pages = await self.crawl_pages_async(start_page, n)
+
+        columns = {column: [] for column in self.COLUMNS}
+        for page, metas in pages:
+            for m in metas or ():
+                for column in self.COLUMNS:
+                    columns[column].append(m.meta[column])
+
+        return DataFrame(columns, columns=self.COLUMNS)
+
+    async def crawl_pages_async(self, start_page: int = 1, n: int = -1) -> list:
+        """
+        crawl in the running event loop, returns [(page number, [NewsMeta])] in order of index pages,
+        the metas of a page failed are None
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        """
+
+        if start_page < 1:
+            raise AttributeError(f'invalid value for start_page: {start_page}')
+        if n <= 0 and ~n:
+            raise AttributeError(f'invalid value for n: {n}')
+
+        self._semaphore = Semaphore(self._concurrency)
+        connector = TCPConnector(limit=self._concurrency)
+
+        async with ClientSession(connector=connector, timeout=self._timeout) as session:
+            self._session = session
+
+            # the first index page tells the last page
+            first = await self.get_index_meta(start_page)
+            end_page = first.last if not ~n else min(start_page + n - 1, first.last)
+
+            pages = [self._crawl_page(start_page, first)]
+            pages.extend(self._crawl_page(page) for page in range(start_page + 1, end_page + 1))
+            metas = await self._gather(pages)
+
+        self._session = None
+
+        return list(zip(range(start_page, end_page + 1), metas))
+
+    async def _crawl_page(self, page: int, index_meta: IndexMeta = None):
+        """
+        crawl the news of an index page, None if failed
+        :param page: the page number
+        :param index_meta: the parsed IndexMeta of page (fetched if None)
+        """
+
+        try:
+            if index_meta is None:
+                index_meta = await self.get_index_meta(page)
+
+            return await self._gather(self.get_news_meta(url) for url in index_meta.newses)
+        except Exception as e:
+            warn(f'[{page}]: crawl failed!\n{e}', source=e)
+            return None
+
+    @staticmethod
+    async def _gather(aws: Iterable) -> list:
+        """
+        run awaitables concurrently (see asyncio.gather), the others are cancelled if one failed,
+        so no task is left running after the session closed
+        :param aws: the awaitables
+        """
+
+        tasks = [ensure_future(aw) for aw in aws]
+        try:
+            return await gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            raise
+
+    async def get_index_meta(self, page: int = 1) -> IndexMeta:
+        """
+        get index page & parse as IndexMeta
+        :param page: the page number to fetch
+        """
+
+        text = await self._get(self.URL_INDEX % page)
+        return await self._parse(IndexParser, text)
+
+    async def get_news_meta(self, url: str) -> NewsMeta:
+        """
+        get news detail page & parse as NewsMeta
+        :param url: the url to fetch
+        """
+
+        text = await self._get(url)
+        return await self._parse(NewsParser, text)
+
+    async def _parse(self, parser: Parser.__class__, text: str) -> Meta:
+        """
+        parse the page in executor
+        :param parser: the page parser class (a parser is not shared between threads)
+        :param text: the page content
+        """
+
+        return await get_running_loop().run_in_executor(self._executor, parser(self._strict).parse, text)
+
+    async def _get(self, url: str, **kwargs) -> str:
+        """
+        send a get method request (with retry machining) and read the content
+        :param url: request url
+        :param kwargs: other options (see aiohttp.ClientSession.request)
+        """
+
+        return await self._request_with_retry('GET', url, **kwargs)
+
+    async def _request_with_retry(self, method: str, url: str, **kwargs) -> str:
+        """
+        send an request with retry machining and read the content
+        :param method: request method
+        :param url: request url
+        :param kwargs: other options (see aiohttp.ClientSession.request)
+        """
+
+        exception = None
+        for i in range(self._retry):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self._session.request(method, url, **kwargs) as response:
+                        if response.status == HTTPStatus.OK:
+                            return await response.text()
+                        if not self._retryable(response.status):
+                            raise RuntimeError(f'Expected status code 200, got {response.status}')
+
+                        # throttled
+                        retry_after = Crawler._retry_after(response)
+            except (ClientError, TimeoutError) as e:
+                exception = e
+
+            await self._wait(i, retry_after)
+
+        if exception is None:
+            raise RetryError(f'Request failed with retry times: {self._retry}')
+        raise RetryError(f'Request failed with retry times: {self._retry}').with_traceback(exception.__traceback__)
+
+    async def _wait(self, attempt: int, retry_after: float = None):
+        """
+        wait before retrying (see Crawler._wait)
+        :param attempt: the failed attempt (0 for the first)
+        :param retry_after: seconds of `Retry-After`
+        """
+
+        if attempt + 1 >= self._retry:
+            return  # no more retry
+
+        delay = uniform(0, min(self._backoff * 2 ** attempt, self.MAX_BACKOFF))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        await sleep(delay)
+
+
+if __name__ == '__main__':
+    crawler = AsyncCrawler()
+    print(crawler.crawl(n=1))
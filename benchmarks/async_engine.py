@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from async_crawler import AsyncCrawler
+from pool import ThreadPool
+from benchmarks.server import NewsSite
+
+from queue import Queue
+from time import perf_counter
+
+
+def threaded(crawler: Crawler.__class__, pages: int, workers: int) -> int:
+    """
+    crawl pages with the thread pool (one page for each task, like CrawlTask)
+    :param crawler: the crawler class
+    :param pages: index pages to crawl
+    :param workers: max worker threads
+    :return: the number of crawled records
+    """
+
+    crawlers = Queue()
+    for i in range(workers):
+        crawlers.put(crawler())
+
+    results = []
+
+    def task(page: int):
+        def executor():
+            c = crawlers.get()
+            results.append(c.crawl(page, 1))
+            crawlers.put(c)
+
+        return executor
+
+    pool = ThreadPool(workers, workers)
+    for page in range(1, pages + 1):
+        pool.put(task(page))
+    pool.stop()
+
+    return sum(len(data) for data in results)
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.async_engine
+    site = NewsSite(pages=8, latency=0.05).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    class LocalAsyncCrawler(AsyncCrawler):
+        URL_INDEX = site.url_index
+
+    for workers in (4, 16):
+        begin = perf_counter()
+        records = threaded(LocalCrawler, site.pages, workers)
+        print(f'thread pool ({workers:>2} workers) {records} records in {perf_counter() - begin:.2f}s')
+
+        begin = perf_counter()
+        records = len(LocalAsyncCrawler(concurrency=workers).crawl())
+        print(f'asyncio ({workers:>2} concurrency)   {records} records in {perf_counter() - begin:.2f}s')
+
+    site.stop()
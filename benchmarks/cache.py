@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from cache import ResponseCache
+from benchmarks.server import NewsSite
+
+from time import perf_counter
+from tempfile import TemporaryDirectory
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.cache
+    site = NewsSite(pages=5, latency=0.01).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    with TemporaryDirectory() as directory:
+        def run(name: str, cache: ResponseCache):
+            requests, not_modified = site.requests, site.not_modified
+
+            begin = perf_counter()
+            data = LocalCrawler(workers=4, pool_size=4, cache=cache).crawl()
+            print(f'{name:12} {len(data)} records in {perf_counter() - begin:.2f}s, '
+                  f'{site.requests - requests} requests ({site.not_modified - not_modified} not modified)')
+            return data
+
+        cache = ResponseCache(directory)
+        cold = run('cold', cache)
+        warm = run('revalidated', cache)
+        assert warm.equals(cold) and site.not_modified == len(cold) + site.pages
+
+        # a modified page is fetched again
+        news_page = site.news_page
+        site.news_page = lambda news: news_page(news).replace(f'news {news}<', f'news {news} (updated)<')
+        updated = run('modified', cache)
+        assert updated['title'][0] == 'news 1 (updated)'
+
+        # parsed again from cache without any request
+        site.stop()
+        replay = run('replay', ResponseCache(directory, replay=True))
+        assert replay.equals(updated)
+
+        # size-bounded: the least recently used bodies are evicted
+        size = cache.size
+        cache.close()
+        bounded = ResponseCache(directory, max_size=size // 2)
+        print(f'bounded      {len(bounded)} responses, {bounded.size} bytes (max {bounded.max_size})')
+        assert bounded.size <= bounded.max_size and len(bounded)
+        bounded.close()
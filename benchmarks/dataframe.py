@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from parsers.news_parser import NewsMeta
+
+from pandas import DataFrame
+from time import perf_counter
+
+
+def synthetic(n: int) -> list:
+    """
+    make synthetic news records
+    :param n: the number of records
+    """
+
+    return [NewsMeta(title=f'news {i}', date='2020-01-08', author='author', content='content ' * 200)
+            for i in range(n)]
+
+
+def row_by_row(metas: list) -> DataFrame:
+    """
+    the former way: append rows with DataFrame.loc
+    :param metas: news records
+    """
+
+    data = DataFrame(columns=list(Crawler.COLUMNS))
+    for m in metas:
+        data.loc[data.shape[0]] = m.meta
+
+    return data
+
+
+def columnar(metas: list) -> DataFrame:
+    """
+    the way of Crawler.crawl: collect columns and build the frame once
+    :param metas: news records
+    """
+
+    columns = {column: [] for column in Crawler.COLUMNS}
+    for m in metas:
+        for column in Crawler.COLUMNS:
+            columns[column].append(m.meta[column])
+
+    return DataFrame(columns, columns=Crawler.COLUMNS)
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.dataframe
+    for n in (1000, 3000):
+        metas = synthetic(n)
+
+        for build in (row_by_row, columnar):
+            begin = perf_counter()
+            data = build(metas)
+            print(f'{build.__name__:<12} {len(data)} records in {perf_counter() - begin:.3f}s')
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.parser import Parser
+from dom_tree.node import TextNode
+from parsers.news_parser import NewsParser
+from benchmarks.tokenizer import TESTDATA
+
+from time import perf_counter
+from tracemalloc import start, stop, take_snapshot
+
+
+def bench(name: str, func: callable, rounds: int = 100):
+    """
+    print the time cost of func
+    :param name: benchmark name
+    :param func: the function to be measured
+    :param rounds: times to repeat
+    """
+
+    begin = perf_counter()
+    for i in range(rounds):
+        func()
+    elapsed = perf_counter() - begin
+
+    print(f'{name:<24} {elapsed / rounds * 1e3:>8.2f} ms')
+
+
+def memory(name: str, parser: Parser, source: str):
+    """
+    print the memory allocated for the parsed document
+    :param name: benchmark name
+    :param parser: the DOM parser
+    :param source: the source text
+    """
+
+    start()
+    before = take_snapshot()
+    root = parser.parse(source)
+    after = take_snapshot()
+    stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f'{name:<24} {size:>8,} bytes')
+
+    return root
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.flat_tree
+    source = open(TESTDATA, 'r', encoding='utf-8').read()
+    tree, flat = Parser(), Parser(flat=True)
+
+    bench('parse (tree)', lambda: tree.parse(source))
+    bench('parse (flat)', lambda: flat.parse(source))
+
+    tree_root = memory('memory (tree)', tree, source)
+    flat_root = memory('memory (flat)', flat, source)
+
+    bench('extract (tree)', lambda: [n.text for n in tree_root.filter().cls('content-item').type(TextNode)])
+    bench('extract (flat)', lambda: [n.text for n in flat_root.filter().cls('content-item').type(TextNode)])
+
+    tree_parser, flat_parser = NewsParser(), NewsParser(flat=True)
+    bench('NewsParser (tree)', lambda: tree_parser.parse(source))
+    bench('NewsParser (flat)', lambda: flat_parser.parse(source))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from main import CrawlTask
+from benchmarks.server import NewsSite
+
+from os import chdir, getcwd
+from tempfile import TemporaryDirectory
+from contextlib import redirect_stdout
+from io import StringIO
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.incremental
+    site = NewsSite(pages=8, per_page=5).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    class LocalTask(CrawlTask):
+        CRAWLER = LocalCrawler
+
+    cwd = getcwd()
+    try:
+        for unit in (1, 2, 4, 8):
+            with TemporaryDirectory() as directory:
+                chdir(directory)  # the seen index & outputs are written to ./data
+
+                requests = []
+                for run in ('first run', 'rerun'):
+                    begin = site.requests
+                    with redirect_stdout(StringIO()):
+                        LocalTask(core_worker_num=4, max_worker_num=4, crawl_unit=unit, incremental=True).start()
+                    requests.append(site.requests - begin)
+
+                chdir(cwd)
+
+            # a rerun with nothing new: index page 1 (for the last page) & page 1 of only known news
+            print(f'crawl_unit {unit}: first run {requests[0]} requests, rerun {requests[1]} requests')
+            assert requests[1] == 2, f'rerun made {requests[1]} requests'
+    finally:
+        chdir(cwd)
+        site.stop()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from benchmarks.tokenizer import TESTDATA
+from parsers.news_parser import NewsParser
+from parsers.memo import ParseMemo
+
+from time import perf_counter
+from os.path import join
+from tempfile import TemporaryDirectory
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.memo
+    content = open(TESTDATA, 'r', encoding='utf-8').read()
+    pages = [content.replace('</h1>', f' {i % 20}</h1>', 1) for i in range(200)]  # 20 distinct pages
+    parser = NewsParser()
+
+    begin = perf_counter()
+    expected = [parser.parse(page).meta for page in pages]
+    print(f'parse        {perf_counter() - begin:.3f}s')
+
+    with TemporaryDirectory() as directory:
+        path = join(directory, 'memo.db')
+
+        with ParseMemo(path=path) as memo:
+            begin = perf_counter()
+            metas = [memo.parse(parser, page).meta for page in pages]
+            print(f'memo         {perf_counter() - begin:.3f}s ({memo.hits} hits, {memo.misses} misses)')
+            assert metas == expected
+
+        # a new process: memory tier is empty, results come from disk tier
+        with ParseMemo(path=path) as memo:
+            begin = perf_counter()
+            metas = [memo.parse(parser, page).meta for page in pages]
+            print(f'memo (disk)  {perf_counter() - begin:.3f}s ({memo.hits} hits, {memo.misses} misses)')
+            assert metas == expected
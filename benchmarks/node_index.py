@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.parser import Parser
+from dom_tree.node_filter import NodeFilter
+from benchmarks.tokenizer import TESTDATA
+
+from time import perf_counter
+
+
+def bench(name: str, queries: callable, rounds: int = 2000):
+    """
+    print the time cost of filtering
+    :param name: benchmark name
+    :param queries: a function running the filters
+    :param rounds: times to repeat
+    """
+
+    begin = perf_counter()
+    for i in range(rounds):
+        queries()
+    elapsed = perf_counter() - begin
+
+    print(f'{name:<12} {elapsed / rounds * 1e6:>10.1f} us/round')
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.node_index
+    source = open(TESTDATA, 'r', encoding='utf-8').read()
+
+    indexed = Parser(index=True).parse(source)
+    # a filter over the children of root always falls back to traversal
+    traversal = NodeFilter(indexed.children)
+
+    def run(f: NodeFilter):
+        f.cls('content-title')
+        f.cls('content-item')
+        f.tag('h1')
+        f.id('gotop')
+
+    bench('index', lambda: run(indexed.filter()))
+    bench('traversal', lambda: run(traversal))
+
+    begin = perf_counter()
+    for i in range(20):
+        Parser(index=False).parse(source)
+    plain = perf_counter() - begin
+
+    begin = perf_counter()
+    for i in range(20):
+        Parser(index=True).parse(source)
+    print(f'index building costs {((perf_counter() - begin) / plain - 1) * 100:.1f}% more parsing time')
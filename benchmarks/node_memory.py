@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import dom_tree.parser
+from dom_tree.parser import Parser
+from benchmarks.tokenizer import TESTDATA
+
+from tracemalloc import start, stop, take_snapshot
+
+
+class DictNode:
+    """
+    the node layout before __slots__: a __dict__ for each node & a children list for each leaf
+    """
+
+    def __init__(self, parent=None, children=None):
+        self.parent = parent
+        self.children = list(children) if children else []
+
+
+class DictDocument(DictNode):
+
+    def __init__(self, index=None, children=None):
+        DictNode.__init__(self, None, children)
+        self.index = index
+
+
+class DictTextNode(DictNode):
+
+    def __init__(self, content: str, parent=None):
+        DictNode.__init__(self, parent)
+        self.content = content
+
+
+class DictTagNode(DictNode):
+
+    def __init__(self, tag, attributes: dict = None, parent=None, children=None):
+        DictNode.__init__(self, parent, children)
+        self.tag = tag
+        self.attributes = attributes if attributes is not None else {}
+
+    @property
+    def cls(self):
+        return self.attributes.get('class', '').split()
+
+
+def measure(source: str) -> int:
+    """
+    bytes allocated (and kept) by parsing source
+    :param source: html content
+    """
+
+    parser = Parser()
+    parser.parse(source)  # warm up (regex caches etc.)
+
+    start()
+    before = take_snapshot()
+    root = parser.parse(source)
+    after = take_snapshot()
+    stop()
+
+    del root
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.node_memory
+    source = open(TESTDATA, 'r', encoding='utf-8').read()
+    nodes = sum(1 for n in Parser().parse(source).filter().traverse())
+
+    size = measure(source)
+
+    # the parser builds the nodes of the former layout (names are still interned by the parser)
+    layout = {name: getattr(dom_tree.parser, name) for name in ('Document', 'TextNode', 'TagNode')}
+    dom_tree.parser.Document, dom_tree.parser.TextNode, dom_tree.parser.TagNode = \
+        DictDocument, DictTextNode, DictTagNode
+    try:
+        baseline = measure(source)
+    finally:
+        for name, cls in layout.items():
+            setattr(dom_tree.parser, name, cls)
+
+    print(f'{nodes} nodes')
+    print(f'__dict__ nodes  {baseline:,} bytes, {baseline / nodes:.1f} bytes/node')
+    print(f'__slots__ nodes {size:,} bytes, {size / nodes:.1f} bytes/node')
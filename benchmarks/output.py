@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from sink import SINKS
+from parsers.news_parser import NewsMeta
+
+import pandas
+from time import perf_counter
+from random import Random
+from os.path import join, getsize
+from tempfile import TemporaryDirectory
+
+
+READERS = {'csv': pandas.read_csv, 'parquet': pandas.read_parquet, 'feather': pandas.read_feather}
+
+
+def synthetic(n: int) -> list:
+    """
+    make synthetic news records with long & varied content
+    :param n: the number of records
+    """
+
+    random = Random(0)
+    words = [''.join(random.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(random.randint(2, 9)))
+             for _ in range(5000)]
+
+    return [NewsMeta(title=f'news {i}', date=f'2020-{i % 12 + 1:02d}-{i % 28 + 1:02d}', author=random.choice(words),
+                     content=' '.join(random.choices(words, k=400))) for i in range(n)]
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.output (parquet & feather require pyarrow)
+    pages, per_page = 2000, 10
+    metas = synthetic(pages * per_page)
+
+    with TemporaryDirectory() as directory:
+        for output, (sink, extension) in SINKS.items():
+            path = join(directory, f'data.{extension}')
+
+            begin = perf_counter()
+            with sink(path, Crawler.COLUMNS) as s:
+                for page in range(pages):
+                    s.write(page + 1, metas[page * per_page:(page + 1) * per_page])
+            written = perf_counter() - begin
+
+            begin = perf_counter()
+            data = READERS[output](path)
+            read = perf_counter() - begin
+
+            assert len(data) == len(metas) and data['title'].iloc[-1] == metas[-1].meta['title']
+            print(f'{output:8} write {written:.3f}s, read {read:.3f}s, {getsize(path) / 1024 / 1024:.1f}MB')
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from benchmarks.server import NewsSite
+
+from time import perf_counter
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.pipeline
+    site = NewsSite(pages=3, latency=0.02).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    expected = None
+    for workers in (1, 4, 8):
+        begin = perf_counter()
+        data = LocalCrawler(pool_size=workers, workers=workers).crawl(1, site.pages)
+        print(f'{workers} workers: {len(data)} records in {perf_counter() - begin:.2f}s')
+
+        # the order of records is the same as one by one crawling
+        if expected is None:
+            expected = list(data['title'])
+        assert list(data['title']) == expected
+
+    site.stop()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from pool import ThreadPool
+
+from time import perf_counter, sleep
+from random import random
+from threading import Thread
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+
+
+def stress(rounds: int = 3):
+    """
+    stress test: producers submit tasks (some failing) to a small pool with bounded queue, the
+    workers grow & are reclaimed between bursts, every task must be done exactly once
+    :param rounds: bursts of tasks
+    """
+
+    pool = ThreadPool(2, 8, max_task_num=16, live_timeout=0.05)
+    futures = []
+
+    def produce(base: int):
+        for i in range(base, base + 2000):
+            futures.append(pool.submit(lambda x: x if x % 97 else 1 / 0, i))
+            if random() < 0.01:
+                sleep(0.001)
+
+    for r in range(rounds):
+        producers = [Thread(target=produce, args=(r * 100000 + p * 10000,)) for p in range(4)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+
+        grown = len(pool.workers)
+        sleep(0.2)  # idle, the workers beyond core are reclaimed
+        reclaimed = len(pool.workers)
+        print(f'stress round {r}: {grown} workers in burst, {reclaimed} after idle')
+        assert grown <= 8 and reclaimed == 2
+
+    pool.stop()
+    assert len(pool.workers) == 0
+
+    inputs = [r * 100000 + p * 10000 + i for r in range(rounds) for p in range(4) for i in range(2000)]
+    failed = sum(1 for f in futures if isinstance(f.exception(), ZeroDivisionError))
+    results = sorted(f.result() for f in futures if f.exception() is None)
+    assert all(f.done() for f in futures) and failed == sum(1 for x in inputs if not x % 97)
+    assert results == sorted(x for x in inputs if x % 97)
+    print(f'stress: {len(futures)} tasks done ({failed} failed as expected)')
+
+
+def dispatch(submit: callable, n: int = 2000) -> tuple:
+    """
+    measure the dispatch latency (submitted -> started) & throughput of empty tasks
+    :param submit: submit(fn) -> Future
+    :param n: the number of tasks
+    :return: (median latency seconds, tasks per second)
+    """
+
+    # latency: one task at a time, the workers are idle
+    latencies = []
+    for i in range(200):
+        begin = perf_counter()
+        started = submit(perf_counter).result()
+        latencies.append(started - begin)
+
+    # throughput: tasks submitted at once
+    begin = perf_counter()
+    futures = [submit(int) for i in range(n)]
+    for future in futures:
+        future.result()
+
+    return median(latencies), n / (perf_counter() - begin)
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.pool
+    stress()
+
+    pool = ThreadPool(4, 4)
+    latency, throughput = dispatch(pool.submit, 20000)
+    pool.stop()
+    print(f'ThreadPool          latency {latency * 1e6:6.1f}us, {throughput:8.0f} tasks/s')
+
+    with ThreadPoolExecutor(4) as executor:
+        latency, throughput = dispatch(executor.submit, 20000)
+    print(f'ThreadPoolExecutor  latency {latency * 1e6:6.1f}us, {throughput:8.0f} tasks/s')
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from benchmarks.tokenizer import TESTDATA
+from parsers.news_parser import NewsParser
+from parsers.process import ProcessParser
+
+from os import cpu_count
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def in_threads(pages: list, threads: int) -> list:
+    """
+    parse pages in threads (the crawling threads parse their pages)
+    :param pages: page contents
+    :param threads: the number of threads
+    """
+
+    parsers = {}
+
+    def parse(page):
+        # a parser is not shared between threads
+        from threading import get_ident
+        parser = parsers.setdefault(get_ident(), NewsParser())
+        return parser.parse(page).meta
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(parse, pages))
+
+
+def in_processes(pages: list, processes: int, batch_size: int) -> list:
+    """
+    parse pages in processes, submitted from 16 threads like the crawling threads do
+    :param pages: page contents
+    :param processes: the number of processes
+    :param batch_size: max pages sent to a process at once
+    """
+
+    parser = NewsParser()
+    with ProcessParser(processes, batch_size) as stage:
+        stage.parse(parser, pages[0])  # processes started
+
+        begin = perf_counter()
+        with ThreadPoolExecutor(16) as executor:
+            metas = list(executor.map(lambda page: stage.parse(parser, page).meta, pages))
+
+    return metas, perf_counter() - begin
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.processes
+    content = open(TESTDATA, 'r', encoding='utf-8').read()
+    pages = [content.replace('</h1>', f' {i}</h1>', 1) for i in range(400)]
+
+    begin = perf_counter()
+    expected = in_threads(pages, 16)
+    print(f'16 threads                 {perf_counter() - begin:.2f}s')
+
+    counts = sorted({1, 2, 4, cpu_count() or 1})
+    for processes in counts:
+        for batch_size in (1, 4, 16):
+            metas, seconds = in_processes(pages, processes, batch_size)
+            assert metas == expected
+            print(f'{processes:2} processes, batch {batch_size:2}    {seconds:.2f}s')
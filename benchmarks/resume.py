@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from main import CrawlTask
+from journal import Journal
+from benchmarks.server import NewsSite
+
+import os
+import sys
+import pandas
+from subprocess import run
+from tempfile import TemporaryDirectory
+
+
+def crawl(url_index: str, failed: set, kill: int, resume: bool):
+    """
+    crawl in this process, dies (without any cleanup) when page `kill` is crawled
+    :param url_index: the index url of the local site
+    :param failed: the pages failed to be crawled
+    :param kill: the page to die at (never dies if 0)
+    :param resume: resume the last crawl?
+    """
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = url_index
+
+        def iter_pages(self, start_page: int = 1, n: int = -1, incremental: bool = False):
+            if start_page == kill:
+                os._exit(1)
+            if start_page in failed:
+                raise RuntimeError(f'page {start_page} failed')
+            return Crawler.iter_pages(self, start_page, n, incremental)
+
+    class LocalTask(CrawlTask):
+        CRAWLER = LocalCrawler
+
+    LocalTask(core_worker_num=2, max_worker_num=2, resume=resume).start()
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.resume
+    if len(sys.argv) > 1:
+        url_index, failed, kill, resume = sys.argv[1:]
+        crawl(url_index, {int(page) for page in failed.split(',') if page}, int(kill), resume == 'resume')
+        sys.exit(0)
+
+    site = NewsSite(pages=60, per_page=2).start()
+    # the crawls are run (and killed) in child processes, each writes ./data of the temp directory
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+
+    with TemporaryDirectory() as directory:
+        # 1. pages 2-21 fail, died at page 50
+        # 2. resumed, the failed pages are crawled again, died at page 19 (after a checkpoint of 16 pages)
+        # 3. resumed to the end
+        for failed, kill, resume in (('2-21', 50, 'new'), ('', 19, 'resume'), ('', 0, 'resume')):
+            if failed:
+                first, last = map(int, failed.split('-'))
+                failed = ','.join(map(str, range(first, last + 1)))
+
+            process = run([sys.executable, '-m', 'benchmarks.resume', site.url_index, failed, str(kill), resume],
+                          cwd=directory, env=env, capture_output=True, text=True)
+            checkpoint = Journal.load(os.path.join(directory, CrawlTask.JOURNAL_PATH))[-1]
+            print(f'{resume:6} (died at page {kill or "-"}): exit {process.returncode}, '
+                  f'checkpoint page {checkpoint["page"]}, failed {checkpoint["failed"]}')
+
+        titles = list(pandas.read_csv(os.path.join(directory, CrawlTask.output_path('csv')))['title'])
+
+    site.stop()
+
+    expected = [f'news {i}' for i in range(1, site.pages * site.per_page + 1)]
+    assert len(titles) == len(expected), f'{len(titles)} records, expected {len(expected)}'
+    assert sorted(titles, key=lambda title: int(title.split()[1])) == expected
+    print(f'{len(titles)} records, every page crawled once')
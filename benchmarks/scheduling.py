@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from main import CrawlTask
+from benchmarks.server import NewsSite
+
+import pandas
+from os import chdir, getcwd
+from time import perf_counter
+from tempfile import TemporaryDirectory
+from contextlib import redirect_stdout
+from io import StringIO
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.scheduling
+    # pages 2 & 3 (index pages and their news) are 20 times slower than the others
+    site = NewsSite(pages=16, per_page=5, latency=0.01, skew={2: 0.2, 3: 0.2}).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    class LocalTask(CrawlTask):
+        CRAWLER = LocalCrawler
+
+    cwd = getcwd()
+    with TemporaryDirectory() as directory:
+        chdir(directory)  # the outputs are written to ./data
+
+        try:
+            for name, unit, news_workers in (('blocks of 4 pages', 4, 1),
+                                             ('single pages', 1, 1),
+                                             ('  & 2 news workers', 1, 2)):
+                begin = perf_counter()
+                with redirect_stdout(StringIO()):
+                    task = LocalTask(core_worker_num=4, max_worker_num=4, crawl_unit=unit, news_workers=news_workers)
+                    task.start()
+                seconds = perf_counter() - begin
+
+                titles = list(pandas.read_csv(task.path)['title'])
+                assert titles == [f'news {i}' for i in range(1, site.pages * site.per_page + 1)]
+                print(f'{name:18} {len(titles)} records in order, {seconds:.2f}s')
+        finally:
+            chdir(cwd)
+
+    site.stop()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+from benchmarks.tokenizer import TESTDATA
+
+from time import sleep, monotonic
+from collections import deque
+from hashlib import sha1
+from email.utils import formatdate, parsedate_to_datetime
+from threading import Thread, Lock
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class NewsSite:
+    """
+    a local stand-in of the news website (index pages & news detail pages)
+    """
+
+    def __init__(self, pages: int = 10, per_page: int = 10, latency: float = 0.0, skew: dict = None,
+                 throttle: int = None):
+        """
+        initialization for site
+        :param pages: the number of index pages
+        :param per_page: the number of news in each index page
+        :param latency: seconds to wait before responding
+        :param skew: {page: latency} the latency for index page & its news instead of `latency`
+        :param throttle: max requests served per second, the others are answered with 429 & Retry-After
+        """
+
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.skew = skew or {}
+        self.throttle = throttle
+
+        self.connections = 0  # connections opened
+        self.requests = 0  # requests handled
+        self.not_modified = 0  # requests answered with 304
+        self.throttled = 0  # requests answered with 429
+        self._served = deque()  # times of the requests served in the last second
+        self.last_modified = formatdate(usegmt=True)
+        self._lock = Lock()
+        self._news = open(TESTDATA, 'r', encoding='utf-8').read()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def url_index(self) -> str:
+        return self.url + '/school-news/page/%d'
+
+    def start(self):
+        """
+        start serving in a daemon thread
+        """
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                with site._lock:
+                    site.connections += 1
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+
+                status, headers, body = site.respond(self.path, self.headers)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        Thread(target=self._server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        """
+        stop serving
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path: str, headers) -> tuple:
+        """
+        make the response for a request, pages have validators (ETag & Last-Modified) and
+        conditional requests are answered with 304 when the page is not modified, the requests
+        over the throttle are answered with 429
+        :param path: request path
+        :param headers: request headers
+        :return: (status, headers, body)
+        """
+
+        if self.throttle is not None:
+            with self._lock:
+                now = monotonic()
+                while len(self._served) and self._served[0] <= now - 1:
+                    self._served.popleft()
+
+                if len(self._served) >= self.throttle:
+                    self.throttled += 1
+                    return 429, {'Retry-After': '1'}, b'too many requests'
+                self._served.append(now)
+
+        page = self.page(path)
+        if page is None:
+            return 404, {}, b'not found'
+
+        body = page.encode()
+        validators = {'ETag': f'"{sha1(body).hexdigest()}"', 'Last-Modified': self.last_modified}
+
+        if 'If-None-Match' in headers:
+            not_modified = headers['If-None-Match'] == validators['ETag']
+        elif 'If-Modified-Since' in headers:
+            not_modified = (parsedate_to_datetime(headers['If-Modified-Since']) >=
+                            parsedate_to_datetime(self.last_modified))
+        else:
+            not_modified = False
+
+        if not_modified:
+            with self._lock:
+                self.not_modified += 1
+            return 304, validators, b''
+
+        return 200, {'Content-Type': 'text/html; charset=utf-8', **validators}, body
+
+    def page(self, path: str):
+        """
+        render the page of path, None if not found
+        :param path: request path
+        """
+
+        parts = path.strip('/').split('/')
+
+        if len(parts) == 3 and parts[:2] == ['school-news', 'page'] and parts[2].isdigit():
+            page = int(parts[2])
+            if 1 <= page <= self.pages:
+                sleep(self.skew.get(page, self.latency))
+                return self.index_page(page)
+
+        elif len(parts) == 2 and parts[0] == 'school-news' and parts[1].endswith('.html'):
+            news = parts[1][:-5]
+            if news.isdigit():
+                sleep(self.skew.get((int(news) - 1) // self.per_page + 1, self.latency))
+                return self.news_page(int(news))
+
+        return None
+
+    def index_page(self, page: int) -> str:
+        """
+        render an index page
+        :param page: page number
+        """
+
+        first = (page - 1) * self.per_page + 1
+        items = ''.join(f'<li class="list-details"><a href="{self.url}/school-news/{i}.html">news {i}</a></li>\n'
+                        for i in range(first, first + self.per_page))
+        last = f'{self.url}/school-news/page/{self.pages}' if page < self.pages else ''
+
+        return (f'<html><body><ul>\n{items}</ul>\n'
+                f'<div class="wp-pagenavi"><span class="current">{page}</span>'
+                f'<span class="extend">...</span><a class="extend" href="{last}">last</a></div>'
+                f'</body></html>')
+
+    def news_page(self, news: int) -> str:
+        """
+        render a news detail page
+        :param news: news number
+        """
+
+        return self._news.replace('学校举办学科建设与学科评估专题报告会</h1>', f'news {news}</h1>')
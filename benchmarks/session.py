@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from benchmarks.server import NewsSite
+
+from time import perf_counter
+
+
+def bench(name: str, site: NewsSite, crawler: Crawler, pages: int):
+    """
+    print connections opened & pages per second of crawling
+    :param name: benchmark name
+    :param site: the local site
+    :param crawler: the crawler
+    :param pages: index pages to crawl
+    """
+
+    connections, requests = site.connections, site.requests
+    begin = perf_counter()
+    crawler.crawl(1, pages)
+    elapsed = perf_counter() - begin
+    crawler.close()
+
+    requests = site.requests - requests
+    print(f'{name:<12} {site.connections - connections:>5} connections '
+          f'{requests:>5} requests {requests / elapsed:>8.1f} pages/s')
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.session
+    site = NewsSite(pages=5).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    bench('no keep-alive', site, LocalCrawler(keep_alive=False), site.pages)
+    bench('pooled', site, LocalCrawler(), site.pages)
+
+    site.stop()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from crawler import Crawler
+from throttle import HostLimiter
+from benchmarks.server import NewsSite
+
+from time import perf_counter, sleep
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.throttle
+    # the site serves at most 20 requests per second, the others are answered with 429 & `Retry-After: 1`
+    site = NewsSite(pages=4, latency=0.01, throttle=20).start()
+
+    class LocalCrawler(Crawler):
+        URL_INDEX = site.url_index
+
+    class FormerCrawler(LocalCrawler):
+        RETRY_STATUSES = ()  # the former way: a 429 fails the request
+
+    for name, crawler, options in (('former', FormerCrawler, {'backoff': 0}),
+                                   ('backoff', LocalCrawler, {}),
+                                   ('backoff & limiter', LocalCrawler, {'limiter': HostLimiter(rate=18, concurrency=8)})):
+        sleep(1)  # a new throttle window
+        requests, throttled = site.requests, site.throttled
+
+        begin = perf_counter()
+        crawled = 0
+        try:
+            for m in crawler(workers=8, pool_size=8, **options).iter_news_metas(1, site.pages):
+                crawled += 1
+            result = 'done'
+        except Exception as e:
+            result = f'failed ({e.__class__.__name__})'
+
+        print(f'{name:18} {result:20} {crawled:3} records in {perf_counter() - begin:.2f}s, '
+              f'{site.requests - requests} requests ({site.throttled - throttled} throttled)')
+
+        if 'limiter' in options:
+            assert result == 'done' and crawled == site.pages * site.per_page
+            bucket, limit = options['limiter'].host(site.url)
+            print(f'{"":18} concurrency limit adapted to {limit.limit:.1f}')
+
+    site.stop()
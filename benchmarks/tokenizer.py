@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.parser import Parser
+
+from time import perf_counter
+from os.path import join, dirname
+
+TESTDATA = join(dirname(dirname(__file__)), 'dom_tree', 'testdata', 'news-29372.html')
+
+
+def tokenize(content: str, match: callable) -> int:
+    """
+    scan all tokens of content
+    :param content: the source text
+    :param match: a function matching one token at a position
+    :return: the number of tokens scanned
+    """
+
+    pos, tokens = 0, 0
+    while pos < len(content):
+        matched = match(content, pos)
+        if matched is None:
+            break
+
+        pos = matched.end()
+        tokens += 1
+
+    return tokens
+
+
+def bench(name: str, content: str, match: callable, rounds: int = 50):
+    """
+    print tokens per second of a match function
+    :param name: benchmark name
+    :param content: the source text
+    :param match: a function matching one token at a position
+    :param rounds: times to repeat
+    """
+
+    tokens = 0
+    begin = perf_counter()
+    for i in range(rounds):
+        tokens += tokenize(content, match)
+    elapsed = perf_counter() - begin
+
+    print(f'{name:<12} {tokens / elapsed:>12,.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.tokenizer
+    source = open(TESTDATA, 'r', encoding='utf-8').read()
+
+    bench('rule loop', source, Parser.RegExp.match)
+    bench('master', source, Parser.RegExp.token.match)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.parser import Parser
+from dom_tree.node import TextNode
+from benchmarks.tokenizer import TESTDATA
+
+from time import perf_counter
+
+LEGACY_ESCAPES = {
+    '&nbsp;': ' ',
+    '&lt;': '<',
+    '&gt;': '>',
+    '&amp;': '&',
+    '&quot;': '"',
+    '&apos;': '\''
+}
+
+
+def legacy_escape(text: str):
+    """
+    the former TextNode.escape (one str.replace pass for each entity)
+    :param text: the text to be unescaped
+    """
+
+    for k in LEGACY_ESCAPES:
+        text = text.replace(k, LEGACY_ESCAPES[k])
+    return text
+
+
+def bench(name: str, func: callable, rounds: int = 1000):
+    """
+    print the time cost of func
+    :param name: benchmark name
+    :param func: the function to be measured
+    :param rounds: times to repeat
+    """
+
+    begin = perf_counter()
+    for i in range(rounds):
+        func()
+    elapsed = perf_counter() - begin
+
+    print(f'{name:<24} {elapsed / rounds * 1e6:>8.1f} us')
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.unescape
+    source = open(TESTDATA, 'r', encoding='utf-8').read()
+    nodes = Parser().parse(source).filter().type(TextNode).nodes
+    contents = [n.content for n in nodes]
+
+    bench('legacy (6 x replace)', lambda: [legacy_escape(c) for c in contents])
+    bench('single pass', lambda: [TextNode.escape(c) for c in contents])
+    bench('cached .text', lambda: [n.text for n in nodes])
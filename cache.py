@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+from time import time
+from json import dumps, loads
+from hashlib import sha256
+from sqlite3 import connect
+from threading import Lock, get_ident
+from os import makedirs, replace, remove, getpid
+from os.path import join, exists
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCache:
+    """
+    on-disk http response cache, bodies are stored content-addressed (by sha256, responses with
+    the same body share one file) and evicted in LRU order when the cache is larger than max_size,
+    cached responses are revalidated with conditional requests (see Crawler._request_with_retry)
+    """
+
+    def __init__(self, path: str, max_size: int = 1 << 30, replay: bool = False):
+        """
+        initialization for cache
+        :param path: the cache directory
+        :param max_size: max bytes of the cached bodies
+        :param replay: offline mode, responses are only served from cache without any request
+        """
+
+        self.path = path
+        self.max_size = max_size
+        self.replay = replay
+
+        makedirs(join(path, 'objects'), exist_ok=True)
+
+        self._lock = Lock()
+        self._connection = connect(join(path, 'index.db'), check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS responses ('
+                                 'url TEXT PRIMARY KEY, hash TEXT NOT NULL, headers TEXT NOT NULL, '
+                                 'encoding TEXT, etag TEXT, last_modified TEXT)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS objects ('
+                                 'hash TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS objects_accessed ON objects (accessed)')
+        self._connection.commit()
+
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+        self._evict()  # max_size may be lowered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """
+        bytes of the cached bodies
+        """
+
+        return self._size
+
+    def validators(self, url: str) -> dict:
+        """
+        the headers of conditional request for a cached url (empty if not cached)
+        :param url: request url
+        """
+
+        with self._lock:
+            row = self._connection.execute('SELECT etag, last_modified FROM responses WHERE url = ?',
+                                           (url,)).fetchone()
+
+        headers = {}
+        if row is not None:
+            if row[0] is not None:
+                headers['If-None-Match'] = row[0]
+            if row[1] is not None:
+                headers['If-Modified-Since'] = row[1]
+
+        return headers
+
+    def get(self, url: str):
+        """
+        get the cached response of url (and mark it recently used), None if not cached
+        :param url: request url
+        """
+
+        with self._lock:
+            row = self._connection.execute('SELECT hash, headers, encoding FROM responses WHERE url = ?',
+                                           (url,)).fetchone()
+            if row is None:
+                return None
+
+            h, headers, encoding = row
+            try:
+                with open(self._object(h), 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                # removed outside, forget the response
+                with self._connection:
+                    self._connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+                return None
+
+            with self._connection:
+                self._connection.execute('UPDATE objects SET accessed = ? WHERE hash = ?', (time(), h))
+
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(loads(headers))
+        response.encoding = encoding
+        response._content = content
+
+        return response
+
+    def put(self, url: str, response: Response):
+        """
+        cache a response (status 200) of url
+        :param url: request url
+        :param response: the response
+        """
+
+        content = response.content
+        h = sha256(content).hexdigest()
+        path = self._object(h)
+
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() in ('content-type', 'etag', 'last-modified')}
+
+        with self._lock:
+            if not exists(path):
+                # written aside and moved, a body file is never seen half written
+                temp = f'{path}.{getpid()}.{get_ident()}'
+                with open(temp, 'wb') as f:
+                    f.write(content)
+                replace(temp, path)
+
+            with self._connection:
+                if self._connection.execute('SELECT 1 FROM objects WHERE hash = ?', (h,)).fetchone() is None:
+                    self._size += len(content)
+                self._connection.execute('INSERT OR REPLACE INTO objects (hash, size, accessed) VALUES (?, ?, ?)',
+                                         (h, len(content), time()))
+                self._connection.execute('INSERT OR REPLACE INTO responses '
+                                         '(url, hash, headers, encoding, etag, last_modified) '
+                                         'VALUES (?, ?, ?, ?, ?, ?)',
+                                         (url, h, dumps(headers), response.encoding,
+                                          response.headers.get('ETag', None),
+                                          response.headers.get('Last-Modified', None)))
+
+            self._evict()
+
+    def _evict(self):
+        """
+        remove the least recently used bodies (and their responses) until the cache fits max_size
+        """
+
+        while self._size > self.max_size:
+            rows = self._connection.execute('SELECT hash, size FROM objects ORDER BY accessed LIMIT 64').fetchall()
+            if not len(rows):
+                break
+
+            with self._connection:
+                for h, size in rows:
+                    if self._size <= self.max_size:
+                        break
+
+                    self._connection.execute('DELETE FROM responses WHERE hash = ?', (h,))
+                    self._connection.execute('DELETE FROM objects WHERE hash = ?', (h,))
+                    self._size -= size
+                    try:
+                        remove(self._object(h))
+                    except FileNotFoundError:
+                        pass
+
+    def _object(self, h: str) -> str:
+        """
+        the body file path of hash
+        :param h: sha256 of body
+        """
+
+        return join(self.path, 'objects', h)
+
+    def close(self):
+        """
+        close the cache index
+        """
+
+        with self._lock:
+            self._connection.close()
@@ -3,65 +3,245 @@
 from parsers.index_parser import *
 from parsers.news_parser import *
 
-from pandas import DataFrame
-
-from typing import Union
+from typing import Union, TYPE_CHECKING
 from http import HTTPStatus
-from requests import request
+from time import perf_counter, sleep
+from random import uniform
+from functools import partial
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import local
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, RetryError
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from seen import SeenIndex
+    from cache import ResponseCache
+    from parsers.memo import ParseMemo
+    from throttle import HostLimiter
+    from parsers.process import ProcessParser
+
 
 class Crawler:
 
     URL_INDEX = 'https://web.fosu.edu.cn/school-news/page/%d'
 
-    def __init__(self, strict: bool = False,  retry: int = 3, timeout: Union[tuple, float] = None):
+    COLUMNS = ('title', 'date', 'author', 'content')
+
+    # the statuses of throttled requests, retried after backoff
+    RETRY_STATUSES = (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE)
+
+    # max seconds of backoff
+    MAX_BACKOFF = 30
+
+    def __init__(self, strict: bool = False,  retry: int = 3, timeout: Union[tuple, float] = None,
+                 pool_size: int = 1, keep_alive: bool = True, workers: int = 1, seen: 'SeenIndex' = None,
+                 cache: 'ResponseCache' = None, memo: 'ParseMemo' = None,
+                 limiter: 'HostLimiter' = None, backoff: float = 0.5, processes: 'ProcessParser' = None):
         """
         initialization for crawler
         :param strict: should parse DOM nodes in strict mode?
         :param retry: retry times
         :param timeout: seconds timeout for connect & read buffer
+        :param pool_size: max connections kept alive for each host
+        :param keep_alive: reuse connections between requests?
+        :param workers: threads fetching news detail pages, with more than 1 worker the crawl is
+                        pipelined: news are fetched as soon as their index page is parsed while
+                        the following index pages are fetched ahead
+        :param seen: the index which the crawled news are recorded into (see seen.SeenIndex),
+                     known news are skipped by incremental crawling
+        :param cache: the cache of get responses (see cache.ResponseCache), a cached response is
+                      revalidated by a conditional request, or served without request in replay mode
+        :param memo: the memo of parse results (see parsers.memo.ParseMemo), identical pages are parsed once
+        :param limiter: the per-host rate & concurrency limiter (see throttle.HostLimiter), may be shared
+        :param backoff: base seconds of the exponential backoff between retries
+        :param processes: the parse stage running in processes (see parsers.process.ProcessParser),
+                          pages are parsed in the threads of crawler if None
         """
 
+        self._strict = strict
         self._retry = retry
         self._timeout = timeout
+        self._workers = workers
+        self._seen = seen
+        self._cache = cache
+        self._memo = memo
+        self._limiter = limiter
+        self._backoff = backoff
+        self._processes = processes
         self._index_parser = IndexParser(strict)
-        self._news_parser = NewsParser(strict)
+        self._local = local()  # parsers keep parsing state, so each thread has its own news parser
+        # the page of only known news the last incremental crawl stopped at (None if not stopped)
+        self.stop_page = None
+
+        # a pooled session, connections are reused by the following requests to the same host
+        self._session = Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
 
-    def crawl(self, start_page: int = 1, n: int = -1) -> DataFrame:
+    def crawl(self, start_page: int = 1, n: int = -1, incremental: bool = False) -> 'DataFrame':
         """
         start the crawler
         :param start_page: start page for crawl
         :param n: crawl n pages (value `-1` means all pages)
+        :param incremental: crawl the unknown news only (see iter_pages)
+        """
+
+        from pandas import DataFrame  # only needed for the frame, see iter_news_metas()
+
+        # collected by columns and the frame is built once
+        columns = {column: [] for column in self.COLUMNS}
+
+        for m in self.iter_news_metas(start_page, n, incremental):
+            for column in self.COLUMNS:
+                columns[column].append(m.meta[column])
+
+        return DataFrame(columns, columns=self.COLUMNS)
+
+    def iter_news_metas(self, start_page: int = 1, n: int = -1, incremental: bool = False):
+        """
+        crawl and yield the NewsMeta records in order of index pages
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        :param incremental: crawl the unknown news only (see iter_pages)
+        """
+
+        return (m for page, metas in self.iter_pages(start_page, n, incremental) for m in metas)
+
+    def iter_pages(self, start_page: int = 1, n: int = -1, incremental: bool = False):
+        """
+        crawl and yield (page number, [NewsMeta]) for each index page in order
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        :param incremental: skip the news known by the seen index, and stop after the first page
+                            which has only known news (the following pages were crawled before),
+                            the page is kept in `stop_page` when the crawl stopped there
         """
 
         if start_page < 1:
             raise AttributeError(f'invalid value for start_page: {start_page}')
         if n <= 0 and ~n:
             raise AttributeError(f'invalid value for n: {n}')
+        if incremental and self._seen is None:
+            raise AttributeError('incremental crawling requires a seen index')
+
+        return self._crawl(start_page, n, incremental)
+
+    def _crawl(self, start_page: int, n: int, incremental: bool):
+        """
+        crawl the news in order of index pages
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        :param incremental: crawl the unknown news only
+        """
+
+        if self._workers <= 1:
+            for page, urls in self._news_urls(start_page, n, incremental):
+                # read & parse news detail pages
+                yield self._crawled(page, urls, [self.get_news_meta(url) for url in urls])
+            return
+
+        # at most `limit` news are in flight, then the walk of index pages waits for the oldest one
+        limit = self._workers * 2
+        fetching = deque()  # [(page, future, urls)] in order, a None future marks the end of a page
+        in_flight = 0
+        metas = []
+        executor = ThreadPoolExecutor(self._workers)
+
+        def drain(everything: bool):
+            # pop the finished heads (or all) of fetching, yields the pages completed
+            nonlocal in_flight, metas
+
+            while len(fetching):
+                page, future, urls = fetching[0]
+                if not (everything or future is None or future.done() or in_flight >= limit):
+                    break
+
+                fetching.popleft()
+                if future is None:
+                    yield self._crawled(page, urls, metas)
+                    metas = []
+                else:
+                    metas.append(future.result())
+                    in_flight -= 1
+
+        try:
+            for page, urls in self._news_urls(start_page, n, incremental):
+                for url in urls:
+                    yield from drain(False)
+
+                    fetching.append((page, executor.submit(self.get_news_meta, url), None))
+                    in_flight += 1
+
+                fetching.append((page, None, urls))
+                yield from drain(False)
+
+            yield from drain(True)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _crawled(self, page: int, urls: list, metas: list) -> tuple:
+        """
+        a page crawled, the news are recorded into the seen index
+        :param page: page number
+        :param urls: the news urls crawled
+        :param metas: the news records of urls
+        """
+
+        if self._seen is not None and len(urls):
+            self._seen.add(zip(urls, metas))
+
+        return page, metas
+
+    def _news_urls(self, start_page: int, n: int, incremental: bool):
+        """
+        walk the index pages, yields (page number, [news url to crawl])
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        :param incremental: skip known news, stop after a page of only known news
+        """
+
+        self.stop_page = None
+        for page, index_meta in self._index_metas(start_page, n):
+            urls = index_meta.newses
+            if not incremental:
+                yield page, urls
+                continue
+
+            known = self._seen.known(urls)
+            yield page, [url for url in urls if url not in known]
+
+            if len(known) and len(known) == len(set(urls)):
+                self.stop_page = page
+                break
+
+    def _index_metas(self, start_page: int, n: int):
+        """
+        walk the index pages, yields (page number, IndexMeta)
+        :param start_page: start page for crawl
+        :param n: crawl n pages (value `-1` means all pages)
+        """
 
         crawled = 0  # crawled page count
-        data = DataFrame(columns=['title', 'date', 'author', 'content'])
 
         while True:
             page = start_page + crawled
             # read & parse index page
             index_meta = self.get_index_meta(page)
-
-            for url in index_meta.newses:
-                # print(f'fetching url: {url}')
-
-                # read & parse news detail page
-                m = self.get_news_meta(url)
-                data.loc[data.shape[0]] = m.meta
+            yield page, index_meta
 
             crawled += 1
 
             if (~n and crawled >= n) or page >= index_meta.last:
                 break
 
-        return data
-
     def get_index_meta(self, page: int = 1) -> IndexMeta:
         """
         get index page & parse as IndexMeta
@@ -72,7 +252,7 @@ class Crawler:
         if response.status_code != HTTPStatus.OK:
             raise RuntimeError(f'Expected status code 200, got {response.status_code}')
 
-        return self._index_parser.parse(response.text)
+        return self._parse(self._index_parser, response.text)
 
     def get_news_meta(self, url: str) -> NewsMeta:
         """
@@ -84,7 +264,31 @@ class Crawler:
         if response.status_code != HTTPStatus.OK:
             raise RuntimeError(f'Expected status code 200, got {response.status_code}')
 
-        return self._news_parser.parse(response.text)
+        parser = getattr(self._local, 'news_parser', None)
+        if parser is None:
+            parser = self._local.news_parser = NewsParser(self._strict)
+
+        return self._parse(parser, response.text)
+
+    def _parse(self, parser: Parser, content: str) -> Meta:
+        """
+        parse page content (through the memo if any)
+        :param parser: the page parser
+        :param content: the raw html page content
+        """
+
+        parse = parser.parse
+        if self._processes is not None:
+            parse = partial(self._processes.parse, parser)
+
+        return parse(content) if self._memo is None else self._memo.parse(parser, content, parse)
+
+    def close(self):
+        """
+        close the pooled connections
+        """
+
+        self._session.close()
 
     def _get(self, url: str, **kwargs):
         """
@@ -97,22 +301,115 @@ class Crawler:
 
     def _request_with_retry(self, method: str, url: str, **kwargs):
         """
-        send an request with retry machining
+        send an request with retry machining (get requests go through the response cache if any)
         :param method: request method
         :param url: request url
         :param kwargs: other options (see requests.request)
         """
 
+        cache = self._cache if method.lower() == 'get' else None
+        if cache is not None:
+            if cache.replay:
+                response = cache.get(url)
+                if response is None:
+                    raise RuntimeError(f'Response not cached (replay mode): {url}')
+                return response
+
+            validators = cache.validators(url)
+            if len(validators):
+                kwargs['headers'] = {**validators, **kwargs.get('headers', {})}
+
         exception = None
         for i in range(self._retry):
+            if self._limiter is not None:
+                self._limiter.acquire(url)
+
+            begin = perf_counter()
+            response = retry_after = None
             try:
-                return request(method, url, timeout=self._timeout, **kwargs)
+                response = self._session.request(method, url, timeout=self._timeout, **kwargs)
+                if self._retryable(response.status_code):
+                    retry_after = self._retry_after(response)
             except RequestException as e:
                 exception = e
+            finally:
+                # the slot is released whatever raised
+                if self._limiter is not None:
+                    ok = response is not None and not self._retryable(response.status_code)
+                    self._limiter.release(url, perf_counter() - begin, ok, retry_after)
+
+            if response is None:
+                self._wait(i)
+                continue
+
+            throttled = self._retryable(response.status_code)
+            if throttled:
+                self._wait(i, retry_after)
                 continue
 
+            if cache is not None:
+                if response.status_code == HTTPStatus.NOT_MODIFIED:
+                    cached = cache.get(url)
+                    if cached is not None:
+                        return cached
+
+                    # evicted meanwhile, fetch again without validators
+                    kwargs.get('headers', {}).pop('If-None-Match', None)
+                    kwargs.get('headers', {}).pop('If-Modified-Since', None)
+                    continue
+                elif response.status_code == HTTPStatus.OK:
+                    cache.put(url, response)
+
+            return response
+
+        if exception is None:
+            raise RetryError(f'Request failed with retry times: {self._retry}')
         raise RetryError(f'Request failed with retry times: {self._retry}').with_traceback(exception.__traceback__)
 
+    def _wait(self, attempt: int, retry_after: float = None):
+        """
+        wait before retrying: exponential backoff with full jitter, or the seconds told by server
+        :param attempt: the failed attempt (0 for the first)
+        :param retry_after: seconds of `Retry-After`
+        """
+
+        if attempt + 1 >= self._retry:
+            return  # no more retry
+
+        delay = uniform(0, min(self._backoff * 2 ** attempt, self.MAX_BACKOFF))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        sleep(delay)
+
+    @classmethod
+    def _retryable(cls, status: int) -> bool:
+        """
+        is a response of status retried after backoff? (shared by async_crawler.AsyncCrawler)
+        :param status: response status code
+        """
+
+        return status in cls.RETRY_STATUSES
+
+    @staticmethod
+    def _retry_after(response):
+        """
+        the seconds of `Retry-After` header (delay seconds or http date), None if absent
+        :param response: the response
+        """
+
+        value = response.headers.get('Retry-After', None)
+        if value is None:
+            return None
+
+        if value.strip().isdigit():
+            return float(value)
+
+        try:
+            return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            return None
+
 
 if __name__ == '__main__':
     crawler = Crawler()
@@ -11,3 +11,9 @@ class MultipleNodesError(DOMTreeError):
     """
     more than 1 nodes found rather than expected 1
     """
+
+
+class SelectorError(DOMTreeError):
+    """
+    invalid css selector
+    """
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+
+from typing import Union
+from array import array
+from dom_tree.node import Node, Document, TextNode, TagNode
+from dom_tree.selector import Selector
+from dom_tree.exceptions import MultipleNodesError
+
+
+class FlatDocument(Document):
+    """
+    document stored as parallel arrays (struct-of-arrays) instead of linked node objects,
+    nodes are numbered in document order (0 is the root) so the subtree of node i is the
+    index range [i, ends[i]), texts & attributes are kept as offsets into the source
+    """
+
+    __slots__ = ('source', 'kinds', 'tags', 'tag_names', 'parents', 'first_children', 'next_siblings',
+                 'ends', 'starts', 'stops', 'spans', '_tag_ids', '_last_children', '_attributes', '_texts')
+
+    ROOT = 0
+    TAG = 1
+    TEXT = 2
+    REMOVED = 3  # unclosed node removed in strict mode
+
+    def __init__(self, source: str = ''):
+        """
+        initialization for flat document
+        :param source: the source text which the offsets point into
+        """
+
+        self.index = None
+        self.source = source
+
+        self.kinds = array('b')  # node kind
+        self.tags = array('i')  # tag id (position in tag_names) for tags, -1 for the others
+        self.tag_names = []
+        self.parents = array('i')  # parent node, -1 for the root
+        self.first_children = array('i')  # first child node, -1 if no child
+        self.next_siblings = array('i')  # next sibling node, -1 if the last child
+        self.ends = array('i')  # end (exclusive) of the subtree
+        self.starts = array('i')  # start offset of text / attributes in source
+        self.stops = array('i')  # end offset of text / attributes in source
+        self.spans = {}  # more spans of the texts merged from several tokens
+
+        self._tag_ids = {}
+        self._last_children = array('i')
+        self._attributes = {}  # parsed attributes (cached)
+        self._texts = {}  # unescaped texts (cached)
+
+        self.add(self.ROOT, None, -1, 0, 0)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind: int, tag: Union[str, None], parent: int, start: int, stop: int) -> int:
+        """
+        add a node as the last child of parent
+        :param kind: node kind
+        :param tag: tag name for tags
+        :param parent: the parent node
+        :param start: start offset of text / attributes in source
+        :param stop: end offset of text / attributes in source
+        :return: the added node
+        """
+
+        i = len(self.kinds)
+
+        tag_id = -1
+        if tag is not None:
+            tag_id = self._tag_ids.get(tag, -1)
+            if tag_id < 0:
+                tag_id = self._tag_ids[tag] = len(self.tag_names)
+                self.tag_names.append(tag)
+
+        self.kinds.append(kind)
+        self.tags.append(tag_id)
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self.ends.append(i + 1)
+        self.starts.append(start)
+        self.stops.append(stop)
+        self._last_children.append(-1)
+
+        if parent >= 0:
+            last = self._last_children[parent]
+            if last < 0:
+                self.first_children[parent] = i
+            else:
+                self.next_siblings[last] = i
+            self._last_children[parent] = i
+
+        return i
+
+    def extend(self, i: int, start: int, stop: int):
+        """
+        append a span of source to a text node
+        :param i: the text node
+        :param start: start offset of the text
+        :param stop: end offset of the text
+        """
+
+        self.spans.setdefault(i, []).append((start, stop))
+
+    def close(self, i: int):
+        """
+        close a node, its subtree ends with the last added node
+        :param i: the node
+        """
+
+        self.ends[i] = len(self.kinds)
+
+    def remove(self, i: int):
+        """
+        remove a node (the last child of its parent) and mount its children to its parent
+        :param i: the node
+        """
+
+        parent = self.parents[i]
+        previous = self.first_children[parent]
+        if previous == i:
+            previous = -1
+        else:
+            while self.next_siblings[previous] != i:
+                previous = self.next_siblings[previous]
+
+        first, last = self.first_children[i], self._last_children[i]
+        if first < 0:
+            last = previous
+
+        if previous < 0:
+            self.first_children[parent] = first
+        else:
+            self.next_siblings[previous] = first
+        self._last_children[parent] = last
+
+        child = self.first_children[i]
+        while child >= 0:
+            self.parents[child] = parent
+            child = self.next_siblings[child]
+
+        self.kinds[i] = self.REMOVED
+        self.first_children[i] = self._last_children[i] = -1
+
+    def last_child(self, i: int) -> int:
+        """
+        the last child of node i, -1 if no child
+        :param i: the node
+        """
+
+        return self._last_children[i]
+
+    def child_nodes(self, i: int):
+        """
+        iterate the children of node i
+        :param i: the node
+        """
+
+        child = self.first_children[i]
+        while child >= 0:
+            yield child
+            child = self.next_siblings[child]
+
+    def tag_of(self, i: int) -> Union[str, None]:
+        """
+        the tag name of node i
+        :param i: the node
+        """
+
+        tag_id = self.tags[i]
+        return self.tag_names[tag_id] if tag_id >= 0 else None
+
+    def content_of(self, i: int) -> str:
+        """
+        the raw text of text node i
+        :param i: the text node
+        """
+
+        content = self.source[self.starts[i]:self.stops[i]]
+        if i in self.spans:
+            content += ''.join(self.source[start:stop] for start, stop in self.spans[i])
+
+        return content
+
+    def text_of(self, i: int) -> str:
+        """
+        the unescaped text of text node i
+        :param i: the text node
+        """
+
+        text = self._texts.get(i, None)
+        if text is None:
+            text = self._texts[i] = TextNode.escape(self.content_of(i))
+
+        return text
+
+    def attributes_of(self, i: int) -> dict:
+        """
+        the attributes of tag node i (parsed at the first access)
+        :param i: the tag node
+        """
+
+        attributes = self._attributes.get(i, None)
+        if attributes is None:
+            from dom_tree.parser import Parser
+
+            attributes = Parser.parse_attributes(self.source, self.starts[i], self.stops[i])
+            self._attributes[i] = attributes
+
+        return attributes
+
+    def node(self, i: int) -> Node:
+        """
+        get the node object (a view of node i)
+        :param i: the node
+        """
+
+        kind = self.kinds[i]
+        if kind == self.TAG:
+            return FlatTagNode(self, i)
+        elif kind == self.TEXT:
+            return FlatTextNode(self, i)
+
+        return self
+
+    @property
+    def parent(self):
+        return None
+
+    @property
+    def children(self):
+        return [self.node(i) for i in self.child_nodes(0)]
+
+    def filter(self):
+        """
+        get a FlatNodeFilter object based on root
+        """
+
+        return FlatNodeFilter(self, [0])
+
+
+class FlatTextNode(TextNode):
+    """
+    text node view of a FlatDocument
+    """
+
+    __slots__ = ('document', 'i')
+
+    def __init__(self, document: FlatDocument, i: int):
+        self.document = document
+        self.i = i
+
+    def __eq__(self, other):
+        return isinstance(other, FlatTextNode) and self.document is other.document and self.i == other.i
+
+    def __hash__(self):
+        return hash((id(self.document), self.i))
+
+    @property
+    def parent(self):
+        return self.document.node(self.document.parents[self.i])
+
+    @property
+    def children(self):
+        return []
+
+    @property
+    def content(self):
+        return self.document.content_of(self.i)
+
+    @property
+    def text(self):
+        return self.document.text_of(self.i)
+
+    def filter(self):
+        return FlatNodeFilter(self.document, [self.i])
+
+
+class FlatTagNode(TagNode):
+    """
+    tag node view of a FlatDocument
+    """
+
+    __slots__ = ('document', 'i')
+
+    def __init__(self, document: FlatDocument, i: int):
+        self.document = document
+        self.i = i
+
+    def __eq__(self, other):
+        return isinstance(other, FlatTagNode) and self.document is other.document and self.i == other.i
+
+    def __hash__(self):
+        return hash((id(self.document), self.i))
+
+    @property
+    def parent(self):
+        return self.document.node(self.document.parents[self.i])
+
+    @property
+    def children(self):
+        return [self.document.node(i) for i in self.document.child_nodes(self.i)]
+
+    @property
+    def tag(self):
+        return self.document.tag_of(self.i)
+
+    @property
+    def attributes(self):
+        return self.document.attributes_of(self.i)
+
+    @property
+    def cls(self):
+        return self.attributes.get('class', '').split()
+
+    def filter(self):
+        return FlatNodeFilter(self.document, [self.i])
+
+
+class FlatNodeFilter:
+    """
+    filter for filtering nodes of a FlatDocument (with the same interface as NodeFilter)
+    """
+
+    def __init__(self, document: FlatDocument, nodes: list):
+        """
+        initialization for filter
+        :param document: the flat document
+        :param nodes: current nodes (node numbers)
+        """
+
+        self.document = document
+        self._nodes = nodes
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return (self.document.node(i) for i in self._nodes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.document.node(i) for i in self._nodes[item]]
+
+        return self.document.node(self._nodes[item])
+
+    @property
+    def nodes(self):
+        return [self.document.node(i) for i in self._nodes]
+
+    @property
+    def node(self):
+        """
+        return the only one node
+        """
+        if len(self._nodes) > 1:
+            raise MultipleNodesError(f'Found {len(self._nodes)} nodes in the filter, expected 1')
+
+        return self.document.node(self._nodes[0]) if len(self._nodes) else None
+
+    @property
+    def index(self):
+        return None
+
+    def _traverse(self):
+        """
+        traverse the nodes (node numbers), each subtree is a contiguous range
+        """
+
+        kinds, ends = self.document.kinds, self.document.ends
+
+        # same order as NodeFilter.traverse()
+        for start in reversed(self._nodes):
+            for i in range(start, ends[start]):
+                if kinds[i] != FlatDocument.REMOVED:
+                    yield i
+
+    def _tags(self):
+        """
+        traverse the tag nodes (node numbers)
+        """
+
+        kinds = self.document.kinds
+        return (i for i in self._traverse() if kinds[i] == FlatDocument.TAG)
+
+    def traverse(self):
+        """
+        traverse the nodes
+        """
+
+        return (self.document.node(i) for i in self._traverse())
+
+    def attr(self, name: str, value: str):
+        """
+        filtered by attribute
+        :param name: attribute name
+        :param value: attribute value
+        """
+
+        nodes = []
+        for i in self._tags():
+            attributes = self.document.attributes_of(i)
+            if name in attributes and attributes[name] == value:
+                nodes.append(i)
+
+        return FlatNodeFilter(self.document, nodes) if len(nodes) else None
+
+    def id(self, idv: str):
+        """
+        filtered by id
+        :param idv: id value
+        """
+
+        for i in self._tags():
+            if self.document.attributes_of(i).get('id', None) == idv:
+                return FlatNodeFilter(self.document, [i])
+
+        return None
+
+    def cls(self, cls: str):
+        """
+        filtered by class
+        :param cls: class
+        """
+
+        attributes = self.document.attributes_of
+        nodes = [i for i in self._tags() if cls in attributes(i).get('class', '').split()]
+
+        return FlatNodeFilter(self.document, nodes)
+
+    def tag(self, tag: str):
+        """
+        filtered by tag name
+        :param tag: tag name
+        """
+
+        tag_id = self.document._tag_ids.get(tag, None)
+        tags = self.document.tags
+
+        return FlatNodeFilter(self.document, [i for i in self._tags() if tags[i] == tag_id])
+
+    def type(self, t: Node.__class__):
+        """
+        filtered by node type
+        :param t: node type
+        """
+
+        kinds = {kind for kind, c in ((FlatDocument.ROOT, Document),
+                                      (FlatDocument.TAG, TagNode),
+                                      (FlatDocument.TEXT, TextNode)) if issubclass(c, t)}
+        nodes = [i for i in self._traverse() if self.document.kinds[i] in kinds]
+
+        return FlatNodeFilter(self.document, nodes)
+
+    def select(self, selector: Union[str, Selector]):
+        """
+        filtered by css selector (see dom_tree.selector.Selector)
+        :param selector: css selector string (compiled & cached) or compiled Selector
+        """
+
+        if isinstance(selector, str):
+            selector = Selector.compile(selector)
+
+        return FlatNodeFilter(self.document, [node.i for node in selector.iterate(self)])
+
+    def child(self, nth: int):
+        """
+        filtered by the position of children
+        :param nth: child position
+        """
+
+        nodes = []
+        for i in self._nodes:
+            children = list(self.document.child_nodes(i))
+            if len(children) <= nth:
+                continue
+            elif nth < 0 and len(children) < -nth:
+                continue
+
+            nodes.append(children[nth])
+
+        return FlatNodeFilter(self.document, nodes)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.node import TagNode
+
+
+class NodeIndex:
+    """
+    side indexes of the tag nodes in a document (class -> nodes, tag -> nodes, id -> nodes),
+    the nodes are kept in document order as long as they are added in that order
+    """
+
+    def __init__(self):
+        self.classes = {}
+        self.tags = {}
+        self.ids = {}
+
+    def add(self, node: TagNode):
+        """
+        add a node into the indexes
+        :param node: the node to be added
+        """
+
+        self.tags.setdefault(node.tag, []).append(node)
+
+        for cls in node.cls:
+            self.classes.setdefault(cls, []).append(node)
+
+        idv = node.id
+        if idv is not None:
+            self.ids.setdefault(idv, []).append(node)
+
+    def remove(self, node: TagNode):
+        """
+        remove a node from the indexes
+        :param node: the node to be removed
+        """
+
+        self.tags[node.tag].remove(node)
+
+        for cls in node.cls:
+            self.classes[cls].remove(node)
+
+        idv = node.id
+        if idv is not None:
+            self.ids[idv].remove(node)
@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
 
+from re import compile
+from sys import intern
+from html import unescape
 from collections.abc import Collection
 
+# the shared children of leaf nodes
+LEAF = ()
+
 
 class Node:
     """
     base dom node abject
     """
 
+    __slots__ = ('parent', 'children')
+
     def __init__(self, parent=None, children: Collection = None):
         if children is None:
             children = []
@@ -24,11 +32,34 @@ class Node:
         return NodeFilter(self)
 
 
+class Document(Node):
+    """
+    root node of a parsed document
+    """
+
+    __slots__ = ('index',)
+
+    def __init__(self, index=None, children: Collection = None):
+        """
+        initialization for document
+        :param index: the dom_tree.index.NodeIndex built while parsing (it is not updated
+                      if the tree is modified afterwards)
+        :param children: child nodes
+        """
+
+        Node.__init__(self, None, children)
+        self.index = index
+
+
 class TextNode(Node):
     """
     text node (with escaped text unescaped)
     """
 
+    # named (HTML5) & numeric character references
+    _reference = compile(r'&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')
+
+    # the references decoded differently from HTML5 (others are decoded by html.unescape)
     escapes = {
         '&nbsp;': ' ',
         '&lt;': '<',
@@ -38,19 +69,35 @@ class TextNode(Node):
         '&apos;': '\''
     }
 
+    __slots__ = ('content', '_text')
+
     def __init__(self, content: str, parent: Node = None):
-        Node.__init__(self, parent)
+        Node.__init__(self, parent, LEAF)
         self.content = content
+        self._text = None  # (content, unescaped text)
 
     @classmethod
     def escape(cls, text: str):
-        for k in cls.escapes:
-            text = text.replace(k, cls.escapes[k])
-        return text
+        if '&' not in text:
+            return text
+
+        return cls._reference.sub(cls._unescape, text)
+
+    @classmethod
+    def _unescape(cls, matched):
+        reference = matched.group(0)
+        text = cls.escapes.get(reference, None)
+
+        return text if text is not None else unescape(reference)
 
     @property
     def text(self):
-        return self.escape(self.content)
+        # unescaped once and cached until the content is replaced
+        content = self.content
+        if self._text is None or self._text[0] is not content:
+            self._text = (content, self.escape(content))
+
+        return self._text[1]
 
 
 class TagNode(Node):
@@ -58,14 +105,17 @@ class TagNode(Node):
     base node object for node(s) with tag
     """
 
+    __slots__ = ('tag', 'attributes', '_cls')
+
     def __init__(self, tag, attributes: dict = None, parent: Node = None, children: Collection = None):
 
         if attributes is None:
             attributes = {}
 
         Node.__init__(self, parent, children)
-        self.tag = tag
+        self.tag = intern(tag)
         self.attributes = attributes
+        self._cls = None  # (class attribute, split classes)
 
     @property
     def id(self):
@@ -73,4 +123,9 @@ class TagNode(Node):
 
     @property
     def cls(self):
-        return self.attributes.get('class', '').split()
+        # split lazily and cached until the class attribute is replaced
+        value = self.attributes.get('class', '')
+        if self._cls is None or self._cls[0] is not value:
+            self._cls = (value, value.split())
+
+        return self._cls[1]
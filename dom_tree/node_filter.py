@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from typing import Union
-from dom_tree.node import Node, TagNode
+from dom_tree.node import Node, TagNode, Document
+from dom_tree.selector import Selector
 from dom_tree.exceptions import MultipleNodesError
 
 
@@ -40,6 +41,17 @@ class NodeFilter:
 
         return self.nodes[0] if len(self.nodes) else None
 
+    @property
+    def index(self):
+        """
+        the node index of the document if filtering from its root, otherwise None
+        """
+
+        if len(self.nodes) == 1 and isinstance(self.nodes[0], Document):
+            return self.nodes[0].index
+
+        return None
+
     def traverse(self):
         """
         traverse the nodes
@@ -62,6 +74,10 @@ class NodeFilter:
         :param value: attribute value
         """
 
+        if name == 'id' and self.index is not None:
+            nodes = self.index.ids.get(value, [])
+            return NodeFilter(nodes.copy()) if len(nodes) else None
+
         nodes = []
         for node in self.traverse():
             if not isinstance(node, TagNode) or name not in node.attributes:
@@ -78,6 +94,10 @@ class NodeFilter:
         :param idv: id value
         """
 
+        if idv is not None and self.index is not None:
+            nodes = self.index.ids.get(idv, None)
+            return NodeFilter(nodes[0]) if nodes else None
+
         for node in self.traverse():
             if not isinstance(node, TagNode):
                 continue
@@ -93,6 +113,9 @@ class NodeFilter:
         :param cls: class
         """
 
+        if self.index is not None:
+            return NodeFilter(self.index.classes.get(cls, []).copy())
+
         nodes = []
         for node in self.traverse():
             if not isinstance(node, TagNode):
@@ -109,6 +132,9 @@ class NodeFilter:
         :param tag: tag name
         """
 
+        if self.index is not None:
+            return NodeFilter(self.index.tags.get(tag, []).copy())
+
         nodes = []
         for node in self.traverse():
             if not isinstance(node, TagNode):
@@ -132,6 +158,17 @@ class NodeFilter:
 
         return NodeFilter(nodes)
 
+    def select(self, selector: Union[str, Selector]):
+        """
+        filtered by css selector (see dom_tree.selector.Selector), the nodes are matched in one pass
+        :param selector: css selector string (compiled & cached) or compiled Selector
+        """
+
+        if isinstance(selector, str):
+            selector = Selector.compile(selector)
+
+        return NodeFilter(list(selector.iterate(self)))
+
     def child(self, nth: int):
         """
         filtered by the position of children
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from dom_tree.node import *
+from dom_tree.index import NodeIndex
+from dom_tree.flat import FlatDocument
 
 from re import compile, I
+from sys import intern
+from collections.abc import Collection
 
 
 class Parser:
@@ -35,7 +39,7 @@ class Parser:
         #               r')\s*', I)  # <tag>children</tag>
 
         start_tag = compile(r'\s*<\s*(?P<tag>[A-Z]+[A-Z0-9-]*)'  # tag name
-                            r'(?P<attributes>[\s\S]*?)'  # attributes
+                            r'(?P<attributes>[\s\S]*?)(?<!\s)'  # attributes (never end with spaces)
                             r'\s*(?P<closed>/)?\s*>',  # Is it closed?
                             I)  # <tag> | <tag/>
 
@@ -49,72 +53,311 @@ class Parser:
 
         _rules = (DTD, CDATA, comment, start_tag, end_tag, text)
 
+        # all of the rules above combined into one alternation (in the same order),
+        # the matched rule is told by `lastgroup` so each token costs a single scan
+        token = compile(r'\s*(?:'
+                        r'(?P<DTD><![A-Z][\s\S]*?>\s*)'  # <!DOCTYPE>
+                        r'|(?P<CDATA><!\[CDATA\[(?P<content>[\s\S]*?)\]\]>\s*)'  # <![CDATA][>]>
+                        r'|(?P<comment><!--(?P<comment_content>[\s\S]*?)-->\s*)'  # <!--comment-->
+                        r'|(?P<start_tag><\s*(?P<tag>[A-Z]+[A-Z0-9-]*)'  # <tag> | <tag/>
+                        r'(?P<attributes>[\s\S]*?)(?<!\s)'
+                        r'\s*(?P<closed>/)?\s*>)'
+                        r'|(?P<end_tag><\s*/\s*(?P<end>[A-Z]+[A-Z0-9-]*)\s*>)'  # </tag>
+                        r'|(?P<text>[\s\S]+?(?=\s*<[\s\S]*?>|$))'  # plaintext
+                        r')', I)
+
+        # the opening of a comment / CDATA section
+        section = compile(r'<!(?:--|\[CDATA\[)', I)
+
         @ classmethod
-        def match(cls, content: str):
+        def match(cls, content: str, pos: int = 0):
             """
             try to match content with the rules above
             :param content: the source text to be matched
+            :param pos: the position to start matching from
             """
 
             for regexp in cls._rules:
-                matched = regexp.match(content)
+                matched = regexp.match(content, pos)
 
                 if matched is not None:
                     return matched
 
             return None
 
-    def __init__(self, strict: bool = False):
+    def __init__(self, strict: bool = False, targets: Collection = None, index: bool = False,
+                 flat: bool = False):
         """
         initialization for parser
         :param strict: in strict mode, the nodes with no close tag will be removed
+        :param targets: only the subtrees of nodes matching these targets (`tag` or `.class`)
+                        are mounted to the root, and parsing stops once every target was found
+                        and the node enclosing the last found target is closed
+        :param index: build the node index (see dom_tree.index.NodeIndex) of the document
+                      while parsing, it is used by NodeFilter when filtering from the root
+        :param flat: output dom_tree.flat.FlatDocument (filtered by FlatNodeFilter) rather than
+                     a linked node tree, the index is not built for it
         """
 
         self._strict = strict
+        self._index = index
+        self._flat = flat
         self._opened = None  # a stack saving the opened tag nodes
+        self._root = None  # the root node being built
+        self._buffer = ''  # the fed but not yet consumed source
+        self._pos = 0  # the consumed position of buffer (the whole source is kept for flat documents)
+
+        self._targets = None if targets is None else frozenset(targets)
+        self._missing = None  # the targets not found yet
+        self._target = None  # the depth of the target node being built
+        self._until = None  # stop once the depth of opened nodes drops to this
+        self._stopped = False
 
-    def parse(self, content: str) -> Node:
+    def parse(self, content: str) -> Document:
         """
         parse content to be a Node object
         :param content: the content to be parsed
         """
 
-        root = Node()
+        self._reset()
+        self._buffer = content
+
+        return self.close()
+
+    def feed(self, chunk: str):
+        """
+        feed a chunk of content to the parser, complete tokens are parsed immediately
+        and the incomplete tail is kept until more content arrives
+        :param chunk: the next chunk of content to be parsed
+        """
+
+        if self._root is None:
+            self._reset()
+
+        self._buffer += chunk
+        self._consume(False)
+
+    def close(self) -> Document:
+        """
+        parse the rest of fed content and return the Node object
+        """
+
+        if self._root is None:
+            self._reset()
+
+        self._consume(True)
+        root = self._root
+        self._root = None  # the next feed() starts a new document
+
+        if self._flat:
+            for i in self._opened:
+                if not isinstance(i, str):
+                    root.close(i)
+            root.close(0)
+
+        return root
+
+    def _reset(self):
+        """
+        reset the parser for a new document
+        """
+
+        self._root = FlatDocument() if self._flat else Document(NodeIndex() if self._index else None)
         self._opened = []
+        self._buffer = ''
+        self._pos = 0
+        self._missing = None if self._targets is None else set(self._targets)
+        self._target = None
+        self._until = None
+        self._stopped = False
+
+    def _consume(self, final: bool):
+        """
+        parse the tokens in buffer
+        :param final: no more content will be fed, otherwise tokens which might be
+                      continued by the next chunk are left in buffer
+        """
+
+        if self._flat:
+            self._build_flat(self._tokens(final))
+        else:
+            self._build(self._tokens(final))
+
+    def _tokens(self, final: bool):
+        """
+        scan the tokens in buffer
+        :param final: no more content will be fed, otherwise tokens which might be
+                      continued by the next chunk are left in buffer
+        """
 
-        while len(content):
-            matched = self.RegExp.match(content)
+        content = self._buffer
+        pos = self._pos  # the source is scanned by offset rather than re-sliced
+
+        while pos < len(content) and not self._stopped:
+            matched = self.RegExp.token.match(content, pos)
             if matched is None:
-                return root
+                break
+
+            if not final and (
+                    # the token reaches the end of buffer (`$` also matches before a trailing newline)
+                    matched.end() >= len(content) - 1 or
+                    # an unclosed comment / CDATA section matches as text until its end arrives
+                    matched.lastgroup == 'text' and self.RegExp.section.match(content, matched.start('text'))):
+                break
+
+            pos = matched.end()  # consume the matched part
+            yield matched
 
-            pattern = matched.re
-            content = content[matched.end():]  # consume the matched part
+        if self._flat:
+            self._pos = pos
+        else:
+            self._buffer = content[pos:] if not final and not self._stopped else ''
+
+    def _build(self, tokens):
+        """
+        build the node tree from tokens
+        :param tokens: the matched tokens
+        """
+
+        root = self._root
+        index = root.index
+        content = self._buffer
+        targeted = self._targets is not None
+
+        for matched in tokens:
+            rule = matched.lastgroup
             parent = self._opened[-1] if len(self._opened) else root
 
-            if pattern is self.RegExp.start_tag:
+            if rule == 'start_tag':
                 tag = matched.group('tag')
-                attributes = matched.group('attributes')
+                attributes = self.parse_attributes(content, *matched.span('attributes'))
                 closed = matched.group('closed')
-                node = TagNode(tag, self._parse_attributes(attributes), parent)
-                parent.children.append(node)
+                node = TagNode(tag, attributes, parent, LEAF)
+
+                if targeted and self._target is None:
+                    # outside of target subtrees, the node is only kept for matching end tags
+                    if not self._is_target(node.tag, node.cls):
+                        node.parent = None
+                        if not closed:
+                            self._opened.append(node)
+                        continue
+
+                    parent = node.parent = root
+                    self._until = len(self._opened) - 1
+                    if not closed:
+                        self._target = len(self._opened)
+
+                if len(parent.children):
+                    parent.children.append(node)
+                else:
+                    parent.children = [node]  # leaves share LEAF until the first child
+
+                if index is not None:
+                    index.add(node)
 
                 if not closed:
                     self._opened.append(node)
 
-            elif pattern is self.RegExp.end_tag:
-                self._close(matched.group('tag'))
+            elif rule == 'end_tag':
+                self._close(matched.group('end'))
+
+                if targeted:
+                    self._closed_targets()
 
-            elif pattern in (self.RegExp.text, self.RegExp.CDATA):
-                text = matched.group('content')
+            elif targeted and self._target is None:
+                continue
+
+            elif rule in ('text', 'CDATA'):
+                text = matched.group('content') if rule == 'CDATA' else matched.group('text')
                 last = parent.children[-1] if len(parent.children) else None
 
                 if isinstance(last, TextNode):
                     last.content += text
                     continue
 
-                parent.children.append(TextNode(text, parent))
+                if len(parent.children):
+                    parent.children.append(TextNode(text, parent))
+                else:
+                    parent.children = [TextNode(text, parent)]
 
-        return root
+    def _build_flat(self, tokens):
+        """
+        build the flat document from tokens
+        :param tokens: the matched tokens
+        """
+
+        doc = self._root
+        doc.source = content = self._buffer
+        targeted = self._targets is not None
+
+        for matched in tokens:
+            rule = matched.lastgroup
+            parent = self._opened[-1] if len(self._opened) else 0
+
+            if rule == 'start_tag':
+                tag = intern(matched.group('tag'))
+                closed = matched.group('closed')
+                start, stop = matched.span('attributes')
+
+                if targeted and self._target is None:
+                    attributes = self.parse_attributes(content, start, stop)
+                    if not self._is_target(tag, attributes.get('class', '').split()):
+                        # outside of target subtrees, only the tag name is kept for matching end tags
+                        if not closed:
+                            self._opened.append(tag)
+                        continue
+
+                    parent = 0
+                    self._until = len(self._opened) - 1
+                    if not closed:
+                        self._target = len(self._opened)
+
+                i = doc.add(FlatDocument.TAG, tag, parent, start, stop)
+
+                if not closed:
+                    self._opened.append(i)
+
+            elif rule == 'end_tag':
+                self._close_flat(matched.group('end'))
+
+                if targeted:
+                    self._closed_targets()
+
+            elif targeted and self._target is None:
+                continue
+
+            elif rule in ('text', 'CDATA'):
+                start, stop = matched.span('content' if rule == 'CDATA' else 'text')
+                last = doc.last_child(parent)
+
+                if last >= 0 and doc.kinds[last] == FlatDocument.TEXT:
+                    doc.extend(last, start, stop)
+                    continue
+
+                doc.add(FlatDocument.TEXT, None, parent, start, stop)
+
+    def _closed_targets(self):
+        """
+        update the states of targets after opened nodes closed
+        """
+
+        depth = len(self._opened)
+        if self._target is not None and depth <= self._target:
+            self._target = None
+        if not self._missing and self._until is not None and depth <= self._until:
+            self._stopped = True
+
+    def _is_target(self, tag: str, classes: list) -> bool:
+        """
+        check whether a node matches the targets (and mark the matched targets found)
+        :param tag: the tag name of node
+        :param classes: the classes of node
+        """
+
+        matched = {tag, *(f'.{cls}' for cls in classes)} & self._targets
+        self._missing -= matched
+
+        return bool(matched)
 
     def _close(self, tag):
         """
@@ -127,30 +370,62 @@ class Parser:
             if node.tag == tag:
                 break
 
-            if self._strict:
+            if self._strict and node.parent is not None:
                 # remove unclosed node
                 node.parent.children.remove(node)
+                if self._root.index is not None:
+                    self._root.index.remove(node)
 
                 # mount the valid node to node.parent
                 for child in node.children:
                     child.parent = node.parent
                     node.parent.children.append(child)
 
-    def _parse_attributes(self, attrs: str) -> dict:
+    def _close_flat(self, tag):
+        """
+        close an opened tag of flat document
+        :param tag: tag name
+        """
+
+        doc = self._root
+
+        while len(self._opened):
+            i = self._opened.pop(-1)
+            if isinstance(i, str):
+                # the tag outside of target subtrees
+                if i == tag:
+                    break
+                continue
+
+            doc.close(i)
+            if doc.tag_of(i) == tag:
+                break
+
+            if self._strict:
+                # remove unclosed node & mount its children to its parent
+                doc.remove(i)
+
+    @classmethod
+    def parse_attributes(cls, content: str, start: int = 0, end: int = None) -> dict:
         """
         parse tag attributes from string
-        :param attrs:
+        :param content: the source text containing the attributes
+        :param start: the start offset of attributes in content
+        :param end: the end offset of attributes in content
         """
 
+        if end is None:
+            end = len(content)
+
         attributes = {}
 
-        while attrs:
-            matched = self.RegExp.attribute.match(attrs)
+        while start < end:
+            matched = cls.RegExp.attribute.match(content, start, end)
             if matched is None:
                 return attributes
 
-            attributes[matched.group('name')] = matched.group('value')
-            attrs = attrs[matched.end():]
+            attributes[intern(matched.group('name'))] = matched.group('value')
+            start = matched.end()
 
         return attributes
 
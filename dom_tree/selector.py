@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+from dom_tree.node import Node, TagNode
+from dom_tree.exceptions import SelectorError
+
+from re import compile, I
+from functools import lru_cache
+
+
+class Selector:
+    """
+    compiled css selector, supports:
+    type (`h1`) & universal (`*`) selectors, `.class`, `#id`, `[attr]`, `[attr=value]`,
+    descendant (`a b`) & child (`a > b`) combinators and selector groups (`a, b`)
+    """
+
+    class Compound:
+        """
+        compound selector (the part between combinators, e.g. `div.a#b[c=d]`)
+        """
+
+        def __init__(self):
+            self.tag = None
+            self.classes = []
+            self.id = None
+            self.attributes = []  # [(name, value or None), ...]
+
+        def match(self, node: Node) -> bool:
+            """
+            check whether node matches the compound selector
+            :param node: the node to be checked
+            """
+
+            if not isinstance(node, TagNode):
+                return False
+            if self.tag is not None and node.tag != self.tag:
+                return False
+            if self.id is not None and node.id != self.id:
+                return False
+
+            if self.classes:
+                classes = node.cls
+                for cls in self.classes:
+                    if cls not in classes:
+                        return False
+
+            for name, value in self.attributes:
+                if name not in node.attributes or value is not None and node.attributes[name] != value:
+                    return False
+
+            return True
+
+    _token = compile(r'(?P<group>\s*,\s*)'  # selector group
+                     r'|(?P<child>\s*>\s*)'  # child combinator
+                     r'|(?P<descendant>\s+)'  # descendant combinator
+                     r'|(?P<tag>[A-Z][A-Z0-9-]*|\*)'  # type selector
+                     r'|\.(?P<cls>[\w-]+)'  # .class
+                     r'|#(?P<id>[\w-]+)'  # #id
+                     r'|\[\s*(?P<name>[\w-]+)\s*'  # [attr]
+                     r'(?:=\s*(?P<quote>["\']?)(?P<value>.*?)(?P=quote)\s*)?\]',  # [attr=value]
+                     I)
+
+    def __init__(self, selector: str):
+        """
+        initialization for selector (use Selector.compile() for the cached ones)
+        :param selector: the css selector
+        """
+
+        self.selector = selector
+        # each complex selector is saved right-to-left as [compound, combinator, compound, ...]
+        self._groups = self._compile(selector.strip())
+
+    def __repr__(self):
+        return f'Selector({self.selector!r})'
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile(selector: str):
+        """
+        compile the selector (cached by the selector string)
+        :param selector: the css selector
+        """
+
+        return Selector(selector)
+
+    @classmethod
+    def _compile(cls, selector: str) -> list:
+        """
+        compile the selector to be query plans
+        :param selector: the css selector
+        """
+
+        groups = []
+        parts = [cls.Compound()]
+        empty = True  # is the last compound empty?
+        pos = 0
+
+        while pos < len(selector):
+            matched = cls._token.match(selector, pos)
+            if matched is None:
+                raise SelectorError(f'Invalid selector {selector!r} at position {pos}')
+
+            pos = matched.end()
+            rule = matched.lastgroup
+            compound = parts[-1]
+
+            if rule in ('group', 'child', 'descendant'):
+                if empty:
+                    raise SelectorError(f'Invalid selector {selector!r} at position {matched.start()}')
+
+                if rule == 'group':
+                    groups.append(parts[::-1])
+                    parts = [cls.Compound()]
+                else:
+                    parts.extend((rule, cls.Compound()))
+
+                empty = True
+                continue
+
+            if rule == 'tag':
+                if not empty:
+                    raise SelectorError(f'Invalid selector {selector!r} at position {matched.start()}')
+                compound.tag = None if matched.group('tag') == '*' else matched.group('tag')
+            elif rule == 'cls':
+                compound.classes.append(matched.group('cls'))
+            elif rule == 'id':
+                compound.id = matched.group('id')
+            else:
+                compound.attributes.append((matched.group('name'), matched.group('value')))
+
+            empty = False
+
+        if empty:
+            raise SelectorError(f'Invalid selector {selector!r}, unexpected end')
+
+        groups.append(parts[::-1])
+
+        return groups
+
+    def match(self, node: Node) -> bool:
+        """
+        check whether node matches the selector
+        :param node: the node to be checked
+        """
+
+        for parts in self._groups:
+            if parts[0].match(node) and self._match_ancestors(node, parts, 0):
+                return True
+
+        return False
+
+    def iterate(self, f):
+        """
+        lazily iterate the nodes matching the selector in the nodes of filter (and their descendants)
+        :param f: a dom_tree.node_filter.NodeFilter
+        """
+
+        index = f.index
+        candidates = f.traverse()
+
+        if index is not None and len(self._groups) == 1:
+            # only nodes of the indexed key of rightmost compound could match
+            compound = self._groups[0][0]
+            if compound.id is not None:
+                candidates = index.ids.get(compound.id, ())
+            elif compound.classes:
+                candidates = index.classes.get(compound.classes[0], ())
+            elif compound.tag is not None:
+                candidates = index.tags.get(compound.tag, ())
+
+        for node in candidates:
+            if self.match(node):
+                yield node
+
+    @classmethod
+    def _match_ancestors(cls, node: Node, parts: list, i: int) -> bool:
+        """
+        check whether the ancestors of node matches the rest of compounds
+        :param node: the node matched parts[i]
+        :param parts: the complex selector (right-to-left)
+        :param i: the position of compound matched by node
+        """
+
+        if i + 1 == len(parts):
+            return True
+
+        combinator, compound = parts[i + 1], parts[i + 2]
+        ancestor = node.parent
+
+        if combinator == 'child':
+            return ancestor is not None and compound.match(ancestor) and cls._match_ancestors(ancestor, parts, i + 2)
+
+        while ancestor is not None:
+            if compound.match(ancestor) and cls._match_ancestors(ancestor, parts, i + 2):
+                return True
+            ancestor = ancestor.parent
+
+        return False
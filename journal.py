@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+from os import fsync
+from json import dumps, loads
+from threading import Lock
+
+
+class Journal:
+    """
+    append-only checkpoint journal (one json entry per line), the entries are fsynced in batches
+    of `sync_every`, a torn last line (crashed while writing) is ignored by load()
+    """
+
+    def __init__(self, path: str, sync_every: int = 1, truncate: bool = False):
+        """
+        initialization for journal
+        :param path: the journal file path
+        :param sync_every: fsync after every `sync_every` entries
+        :param truncate: start a new journal (or append to the existing one)?
+        """
+
+        self.path = path
+        self.sync_every = sync_every
+
+        self._file = open(path, 'w' if truncate else 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, entry: dict):
+        """
+        append an entry
+        :param entry: the entry (json serializable)
+        """
+
+        with self._lock:
+            self._file.write(dumps(entry) + '\n')
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._sync()
+
+    def sync(self):
+        """
+        fsync the entries appended
+        """
+
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """
+        fsync & close the journal
+        """
+
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    @staticmethod
+    def load(path: str) -> list:
+        """
+        load the entries of a journal (empty if no journal)
+        :param path: the journal file path
+        """
+
+        entries = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(loads(line))
+                    except ValueError:
+                        break  # torn write
+        except FileNotFoundError:
+            pass
+
+        return entries
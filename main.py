@@ -2,10 +2,20 @@
 
 from crawler import Crawler
 from pool import ThreadPool
+from sink import SINKS
+from seen import SeenIndex
+from cache import ResponseCache
+from parsers.memo import ParseMemo
+from throttle import HostLimiter
+from parsers.process import ProcessParser
+from journal import Journal
+from time import strftime
 from queue import Queue
 from warnings import warn
-from os import makedirs, remove, listdir
-from os.path import join, exists, isfile
+from threading import Lock
+from os import makedirs
+from os.path import join, exists
+from itertools import chain, count
 
 
 class CrawlTask:
@@ -14,32 +24,72 @@ class CrawlTask:
     """
 
     DATA_PATH = './data'
-    TEMP_PATH = join(DATA_PATH, 'temp')
+    SEEN_PATH = join(DATA_PATH, 'seen.db')
+    CACHE_PATH = join(DATA_PATH, 'cache')
+    MEMO_PATH = join(DATA_PATH, 'memo.db')
+    JOURNAL_PATH = join(DATA_PATH, 'journal.log')
+
+    CRAWLER = Crawler
 
     def __init__(self, start_page: int = 1, n: int = -1,
                  core_worker_num: int = 2, max_worker_num: int = 4,
-                 crawl_unit: int = 10):
+                 crawl_unit: int = 1, news_workers: int = 1, output: str = 'csv', incremental: bool = False,
+                 cache: bool = False, replay: bool = False, memo: bool = False, rate: float = None,
+                 processes: int = 0, batch_size: int = 4, resume: bool = False):
         """
         initialization for CrawTask
         :param start_page: the start page to crawl
         :param n: crawl n pages (value `-1` means all pages)
         :param core_worker_num: see pool.ThreadPool
         :param max_worker_num: see pool.ThreadPool
-        :param crawl_unit: the page unit to crawl for a single task
+        :param crawl_unit: the pages crawled by a single task, the tasks are queued and taken by the idle
+                           workers, so a slow page holds only its worker (single pages by default)
+        :param news_workers: threads of each crawler fetching news detail pages (see Crawler)
+        :param output: output format, one of sink.SINKS (`csv`, `parquet` or `feather`)
+        :param incremental: crawl the news not crawled before only (see Crawler.iter_pages), the crawled
+                            news of each run are recorded in SEEN_PATH, incremental runs write the new
+                            news into `data-<time>.<format>` instead of `data.<format>`
+        :param cache: cache the responses in CACHE_PATH (see cache.ResponseCache)
+        :param replay: crawl from the cached responses only, without any request
+        :param memo: memoize the parse results (see parsers.memo.ParseMemo) in memory & in MEMO_PATH, so
+                     an identical page is parsed once, even by a later run, no memo (no content hashing)
+                     if False
+        :param rate: max requests per second to the host (no rate limit if None), all crawlers share
+                     one limiter (see throttle.HostLimiter), which adapts the requests in flight too
+        :param processes: the number of processes parsing pages (see parsers.process.ProcessParser),
+                          pages are parsed in the crawling threads if 0
+        :param batch_size: max pages sent to a parsing process at once
+        :param resume: resume the last crawl (of the same start page) died partway, the pages written to
+                       `data.csv` are checkpointed in JOURNAL_PATH (see sink.CsvSink), only the pages failed
+                       or after the last checkpoint are crawled and appended (csv output, not incremental),
+                       note the failed pages are appended after the checkpointed ones, so the output of a
+                       resumed crawl is no longer in order of pages if any page failed before resuming
         """
 
-        if not exists(self.TEMP_PATH):
-            makedirs(self.TEMP_PATH)
-        else:
-            self._clean()
+        if output not in SINKS:
+            raise AttributeError(f'invalid value for output: {output}')
+        if resume and (output != 'csv' or incremental):
+            raise AttributeError('only csv output of a crawl not incremental could be resumed')
+
+        makedirs(self.DATA_PATH, exist_ok=True)
+        self._seen = SeenIndex(self.SEEN_PATH)
+        self._cache = ResponseCache(self.CACHE_PATH, replay=replay) if cache or replay else None
+        self._memo = ParseMemo(path=self.MEMO_PATH) if memo else None
+        # each crawler requests with its news workers & the thread walking index pages
+        self._limiter = HostLimiter(rate, concurrency=max_worker_num * (news_workers + 1))
+        self._processes = ProcessParser(processes, batch_size) if processes > 0 else None
 
         # ensures each thread run with one crawler
         self._crawlers = Queue(maxsize=max_worker_num)
         for i in range(max_worker_num):
-            # initialize max_worker_num crawlers
-            self._crawlers.put(Crawler())
+            # initialize max_worker_num crawlers, each crawler is used by one task at a time
+            # so max_worker_num * news_workers connections are kept alive in total
+            self._crawlers.put(self.CRAWLER(pool_size=news_workers, workers=news_workers,
+                                            seen=self._seen, cache=self._cache, memo=self._memo,
+                                            limiter=self._limiter, processes=self._processes))
 
-        self._pool = ThreadPool(core_worker_num, max_worker_num)
+        # tasks are submitted while the workers take them (the queue is bounded)
+        self._pool = ThreadPool(core_worker_num, max_worker_num, max_task_num=max_worker_num)
 
         self._crawl_all = not ~n
         self._start = start_page
@@ -55,76 +105,199 @@ class CrawlTask:
             warn(f'no enough page to crawl, n was set to {n}')
 
         self._n = self._pages - self._start + 1 if self._crawl_all else n
+        self._output = output
+        self._incremental = incremental
+        self._sink = None
+        # incremental crawling stops at the first page of only known news, the later pages are skipped
+        self._stop_page = float('inf')
+        self._lock = Lock()
+
+        self.path = self.output_path(output, strftime('data-%Y%m%d-%H%M%S') if incremental else 'data')
+
+        self._resume_page = self._start  # the pages before it were crawled (except the failed ones)
+        self._failed = []  # the pages failed before resuming
+        self._offset = None  # bytes of the output checkpointed
+        self._journal = None
+        if output == 'csv' and not incremental:
+            header = {'start': self._start, 'path': self.path}
+            entries = Journal.load(self.JOURNAL_PATH) if resume else []
+            if len(entries) > 1 and entries[0] == header and exists(self.path):
+                checkpoint = entries[-1]
+                self._resume_page = checkpoint['page'] + 1
+                self._failed = checkpoint['failed']
+                self._offset = checkpoint['offset']
+                print(f'resumed: pages {self._start}-{checkpoint["page"]} crawled before, '
+                      f'{len(self._failed)} pages failed to be crawled again')
+                self._journal = Journal(self.JOURNAL_PATH)
+            else:
+                if resume:
+                    warn('no checkpoint to resume, crawl from the start page')
+                # a new crawl, its pages are checkpointed from now on
+                self._journal = Journal(self.JOURNAL_PATH, truncate=True)
+                self._journal.append(header)
 
     def start(self):
         """
         start crawl task
         """
 
-        for i in range(self._start, self._start + self._n, self._crawl_unit):
-            self._pool.put(self._task(i))
+        # records are streamed into the output in order of pages while the tasks finish
+        if self._journal is not None:
+            # the failed pages are crawled again (appended to the output) before the pages not crawled
+            self._sink = self.sink(self._output, self._resume_page, self.path,
+                                   pages=chain(self._failed, count(self._resume_page)),
+                                   journal=self._journal, offset=self._offset, failed=self._failed)
+        else:
+            self._sink = self.sink(self._output, self._start, self.path)
+
+        units = chain(self._failed, range(self._resume_page, self._start + self._n, self._crawl_unit))
+        crawled = 0  # records crawled
+        if self._incremental:
+            # new news are on the first pages, walked one by one until a page of only known news
+            for start_page in units:
+                if start_page >= self._stop_page:
+                    break
+                crawled += self._crawl(start_page)
+        else:
+            # the sink restores the order of pages finished out of order
+            for records in self._pool.map(self._crawl, units, ordered=False):
+                crawled += records
+
+        self._pool.stop()
+        while not self._crawlers.empty():
+            self._crawlers.get().close()
+
+        self._sink.close()
+        if self._journal is not None:
+            self._journal.close()
+        self._seen.close()
+        if self._cache is not None:
+            self._cache.close()
+        if self._memo is not None:
+            self._memo.close()
+        if self._processes is not None:
+            self._processes.close()
+        print(f'done! {crawled} records crawled')
+
+    @classmethod
+    def output_path(cls, output: str, name: str = 'data') -> str:
+        """
+        the path of output file `<name>.<extension>` (in DATA_PATH)
+        :param output: output format, see sink.SINKS
+        :param name: output file name
+        """
+
+        return join(cls.DATA_PATH, f'{name}.{SINKS[output][1]}')
+
+    @classmethod
+    def sink(cls, output: str, start_page: int = 1, path: str = None, **kwargs):
+        """
+        open the sink writing output file
+        :param output: output format, see sink.SINKS
+        :param start_page: the first page to be written
+        :param path: output file path (`data.<extension>` in DATA_PATH if None)
+        :param kwargs: the other arguments of the sink (e.g. journal of CsvSink)
+        """
 
-        self._pool.stop()  # wait for all tasks finished
-        print('merging files...')
-        self._merge()  # merge temp files
-        print('done!')
+        return SINKS[output][0](path or cls.output_path(output), cls.CRAWLER.COLUMNS, start_page, **kwargs)
 
-    def _task(self, start_page: int) -> callable:
+    def _crawl(self, start_page: int) -> int:
         """
-        single crawl task
+        single crawl task, crawls a unit of pages
         :param start_page: start page to crawl
+        :return: the number of records crawled
         """
 
-        def executor():
-            end_page = start_page + n - 1 if ~n else ''
+        if start_page < self._resume_page:
+            # a page failed before resuming, crawled alone
+            n, end_page = 1, start_page
+        else:
+            n = min(self._crawl_unit, self._start + self._n - start_page)
+            end_page = start_page + n - 1
+            if self._crawl_all and end_page >= self._pages:
+                n = -1  # the last unit crawls to the end, even if pages were added
+
+        page = start_page  # the next page to be written
+        crawled = 0
 
+        if start_page >= self._stop_page:
+            print(f'[{start_page}-{end_page}]: skipped (crawled before)')
+        else:
+            crawler = self._crawlers.get()  # get a crawler from pool
             try:
                 print(f'[{start_page}-{end_page}]: crawling...')
-                crawler = self._crawlers.get()  # get a crawler from pool
-                data = crawler.crawl(start_page, n)
-                self._crawlers.put(crawler)  # put the crawler back to pool
-                data.to_csv(join(self.TEMP_PATH, f'{start_page}-{end_page}.csv'),
-                            header=start_page == self._start, index=False)
+                for page, metas in crawler.iter_pages(start_page, n, self._incremental):
+                    self._sink.write(page, metas)
+                    crawled += len(metas)
+                    page += 1
+                    if page >= self._stop_page:
+                        break
+
+                if self._incremental and crawler.stop_page is not None:
+                    # stopped by a page of only known news, the pages after it were crawled before
+                    with self._lock:
+                        self._stop_page = min(self._stop_page, crawler.stop_page + 1)
                 print(f'[{start_page}-{end_page}]: crawl successfully!')
             except Exception as e:
                 warn(f'[{start_page}-{end_page}]: crawl failed!\n{e}', source=e)
+            finally:
+                self._crawlers.put(crawler)  # put the crawler back to pool
 
-        n = self._crawl_unit
-        if start_page + self._crawl_unit > self._pages:
-            n = self._pages - start_page if not self._crawl_all else -1
-
-        return executor
-
-    def _clean(self):
-        """
-        clean the temp directory
-        """
-
-        for n in listdir(self.TEMP_PATH):
-            path = join(self.TEMP_PATH, n)
+        # the pages not crawled are skipped, the following pages are not held back
+        for page in range(page, end_page + 1):
+            self._sink.skip(page)
 
-            if isfile(path):
-                remove(path)
+        return crawled
 
-    def _merge(self):
-        """
-        merge the crawled csv files
-        """
 
-        files = listdir(self.TEMP_PATH)
-        files.sort()  # sort by page number ASC
-        f = open(join(self.DATA_PATH, 'data.csv'), 'w', encoding='utf-8')
+if __name__ == '__main__':
+    from argparse import ArgumentParser
 
-        for n in files:
-            path = join(self.TEMP_PATH, n)
-            if isfile(path):
-                f.write(open(path, 'r', encoding='utf-8').read())
+    args = ArgumentParser(description='crawl all news')
+    args.add_argument('--engine', choices=('thread', 'async'), default='thread',
+                      help='crawl with a thread pool (default) or asyncio (see async_crawler.AsyncCrawler)')
+    args.add_argument('--output', choices=tuple(SINKS), default='csv',
+                      help='output format of data/data.<format> (parquet & feather require pyarrow)')
+    args.add_argument('--incremental', action='store_true',
+                      help='crawl the news not crawled before only (thread engine)')
+    args.add_argument('--cache', action='store_true',
+                      help='cache the responses in data/cache, cached pages are revalidated (thread engine)')
+    args.add_argument('--replay', action='store_true',
+                      help='crawl from the cached responses only, without network (thread engine)')
+    args.add_argument('--memo', action='store_true',
+                      help='memoize the parse results in memory & data/memo.db (thread engine)')
+    args.add_argument('--rate', type=float, default=None,
+                      help='max requests per second to the news website (thread engine)')
+    args.add_argument('--processes', type=int, default=0,
+                      help='the number of processes parsing pages, 0 to parse in threads (thread engine)')
+    args.add_argument('--batch-size', type=int, default=4,
+                      help='max pages sent to a parsing process at once (thread engine)')
+    args.add_argument('--resume', action='store_true',
+                      help='resume the last crawl died partway from data/journal.log (thread engine, csv)')
+    args = args.parse_args()
 
-        f.close()
+    if args.engine == 'async':
+        from asyncio import run
+        from async_crawler import AsyncCrawler
 
+        makedirs(CrawlTask.DATA_PATH, exist_ok=True)
+        pages = run(AsyncCrawler(concurrency=16).crawl_pages_async())
+        path = CrawlTask.output_path(args.output)
+        with CrawlTask.sink(args.output, path=path) as output:
+            for page, metas in pages:
+                if metas is None:
+                    output.skip(page)  # failed
+                else:
+                    output.write(page, metas)
+    else:
+        task = CrawlTask(core_worker_num=4, max_worker_num=16, output=args.output, incremental=args.incremental,
+                         cache=args.cache, replay=args.replay, memo=args.memo,
+                         rate=args.rate, processes=args.processes, batch_size=args.batch_size,
+                         resume=args.resume)
+        task.start()
+        path = task.path
 
-if __name__ == '__main__':
-    CrawlTask(core_worker_num=4, max_worker_num=16).start()
+    import pandas
 
-    from pandas import read_csv
-    print(read_csv(join(CrawlTask.DATA_PATH, 'data.csv')))
+    read = {'csv': pandas.read_csv, 'parquet': pandas.read_parquet, 'feather': pandas.read_feather}[args.output]
+    print(read(path))
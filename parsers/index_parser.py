@@ -2,10 +2,15 @@
 
 from parsers.parser import Meta, Parser
 from dom_tree.parser import Parser as DOMTreeParser
+from dom_tree.selector import Selector
 
 from re import compile
 from collections.abc import Collection
 
+_items = Selector.compile('.list-details')
+_current = Selector.compile('.current')
+_extend = Selector.compile('.extend')
+
 
 class IndexMeta(Meta):
     """
@@ -30,15 +35,19 @@ class IndexParser(Parser):
     parsers for index page
     """
 
+    targets = ('.list-details', '.current', '.extend')
+
+    meta = IndexMeta
+
     def parse(self, content: str) -> IndexMeta:
-        root = self._parser.parse(content)
+        root = self._parser.parse(content).filter()
 
-        items = root.filter().cls('list-details').child(0)
+        items = root.select(_items).child(0)
         newses = [node.attributes['href'] for node in items]
 
-        page = int(root.filter().cls('current').child(0).node.text)
+        page = int(root.select(_current).child(0).node.text)
 
-        last_page = root.filter().cls('extend').nodes[-1].attributes['href'].split('/')[-1]
+        last_page = root.select(_extend).nodes[-1].attributes['href'].split('/')[-1]
         last = int(last_page) if last_page else page
 
         return IndexMeta(page=page, last=last, newses=newses)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+from parsers.parser import Meta, Parser
+import dom_tree
+
+from sys import modules
+from glob import glob
+from os.path import dirname, join
+from json import dumps, loads
+from hashlib import blake2b
+from sqlite3 import connect
+from threading import Lock
+from collections import OrderedDict
+
+
+class ParseMemo:
+    """
+    memo of parse results keyed by the hash of page content, so an identical page is not
+    parsed (no DOM tree is built) again: a bounded in-memory LRU tier and an optional disk tier,
+    the key also covers the parser (class, mode & the sources it parses with: the modules of the
+    parser class & its bases, and the dom_tree package) so a changed parser does not hit the
+    results of the former one
+    """
+
+    def __init__(self, max_size: int = 1024, path: str = None):
+        """
+        initialization for memo
+        :param max_size: max number of results kept in memory
+        :param path: the sqlite database path of disk tier (no disk tier if None)
+        """
+
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        self._memo = OrderedDict()  # {key: meta dict} in LRU order
+        self._fingerprints = {}  # {parser class: fingerprint}
+        self._lock = Lock()
+        self._connection = None
+
+        if path is not None:
+            self._connection = connect(path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS metas (key TEXT PRIMARY KEY, meta TEXT NOT NULL)')
+            self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._memo)
+
+    def parse(self, parser: Parser, content: str, parse: callable = None) -> Meta:
+        """
+        parse content with parser, or get the memoized result
+        :param parser: the page parser
+        :param content: the raw html page content
+        :param parse: parse(content) -> Meta, how to parse if missed (`parser.parse` if None)
+        """
+
+        key = self._key(parser, content)
+        meta = self._get(key)
+
+        if meta is None:
+            result = (parse or parser.parse)(content)
+            self._put(key, result.meta)
+            return result
+
+        return parser.meta(**meta)
+
+    def _key(self, parser: Parser, content: str) -> str:
+        """
+        the memo key of parsing content with parser
+        :param parser: the page parser
+        :param content: the raw html page content
+        """
+
+        cls = parser.__class__
+        fingerprint = self._fingerprints.get(cls, None)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[cls] = f'{cls.__module__}.{cls.__qualname__}:' \
+                                                    f'{self._fingerprint(cls)}'
+
+        h = blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        return f'{fingerprint}:{int(parser._strict)}:{h}'
+
+    @staticmethod
+    def _fingerprint(cls: Parser.__class__) -> str:
+        """
+        the hash of the sources parsing with a parser class
+        :param cls: the page parser class
+        """
+
+        paths = {getattr(modules.get(base.__module__, None), '__file__', None) for base in cls.__mro__}
+        paths.discard(None)
+        paths.update(glob(join(dirname(dom_tree.__file__), '*.py')))
+
+        digest = blake2b(digest_size=8)
+        for path in sorted(paths):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+
+        return digest.hexdigest()
+
+    def _get(self, key: str):
+        """
+        get the memoized meta dict (a copy), None if missed
+        :param key: memo key
+        """
+
+        with self._lock:
+            meta = self._memo.get(key, None)
+            if meta is not None:
+                self._memo.move_to_end(key)
+            elif self._connection is not None:
+                row = self._connection.execute('SELECT meta FROM metas WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    meta = loads(row[0])
+                    self._remember(key, meta)
+
+            if meta is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        # the lists (e.g. urls of index page) are copied, the caller owns the result
+        return {k: list(v) if isinstance(v, list) else v for k, v in meta.items()}
+
+    def _put(self, key: str, meta: dict):
+        """
+        memoize a meta dict
+        :param key: memo key
+        :param meta: the meta dict
+        """
+
+        meta = {k: list(v) if isinstance(v, list) else v for k, v in meta.items()}
+
+        with self._lock:
+            self._remember(key, meta)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute('INSERT OR REPLACE INTO metas (key, meta) VALUES (?, ?)',
+                                             (key, dumps(meta, ensure_ascii=False)))
+
+    def _remember(self, key: str, meta: dict):
+        """
+        keep a meta dict in memory tier, the least recently used one is dropped if full
+        :param key: memo key
+        :param meta: the meta dict
+        """
+
+        self._memo[key] = meta
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.max_size:
+            self._memo.popitem(last=False)
+
+    def close(self):
+        """
+        close the disk tier
+        """
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
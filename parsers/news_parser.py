@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from dom_tree.node import TextNode
+from dom_tree.selector import Selector
 from parsers.parser import Meta, Parser
 
-from re import compile
 from datetime import date
-from functools import reduce
+
+_title = Selector.compile('.content-title h1')
+_time = Selector.compile('.content-title .vartime')
+_content = Selector.compile('.content-item')
 
 
 class NewsMeta(Meta):
@@ -40,27 +43,41 @@ class NewsParser(Parser):
     parsers for news detail page
     """
 
-    _regexp_author = compile(r'(?P<content>[\s\S]*)((?P<b1>\()|(?P<b2>（))'  # bracket
-                             r'(?P<author>.*?)'  # author
-                             r'(?(b1)\)|(?(b2)）|(?!)))\s*$')
+    targets = ('.content-title', '.content-item')
 
-    def parse(self, content: str) -> NewsMeta:
-        root = self._parser.parse(content)
-        header = root.filter().cls('content-title')
-        title = header.tag('h1').child(0).node.text
-        time = header.cls('vartime').child(0).node.text[-10:]
-        texts = root.filter().cls('content-item').type(TextNode)
-        content = reduce(lambda r, s: r + s.text.strip(), texts, '')
+    meta = NewsMeta
 
-        author = None
-        matched = self._regexp_author.match(content)
+    # closing bracket -> opening bracket of the trailing author, e.g. `（author）`
+    _brackets = {')': '(', '）': '（'}
 
-        if matched is not None:
-            author = matched.group('author')
-            content = content[:matched.end('content')]
+    def parse(self, content: str) -> NewsMeta:
+        root = self._parser.parse(content).filter()
+        title = root.select(_title).child(0).node.text
+        time = root.select(_time).child(0).node.text[-10:]
+        texts = root.select(_content).type(TextNode)
+        content, author = self._split_author(''.join(s.text.strip() for s in texts))
 
         return NewsMeta(title=title, author=author, date=time, content=content)
 
+    @classmethod
+    def _split_author(cls, content: str) -> tuple:
+        """
+        split the trailing bracketed author (in one line) from content by scanning backwards
+        :param content: the news content
+        :return: (content, author), author is None if not found
+        """
+
+        stripped = content.rstrip()
+        opening = cls._brackets.get(stripped[-1:], None)
+        if opening is None:
+            return content, None
+
+        pos = stripped.rfind(opening, 0, len(stripped) - 1)
+        if pos < 0 or '\n' in stripped[pos + 1:-1]:
+            return content, None
+
+        return content[:pos], stripped[pos + 1:-1]
+
 
 if __name__ == '__main__':
     from requests import get
@@ -17,9 +17,16 @@ class Parser:
     base parsers interface
     """
 
-    def __init__(self, strict: bool = False):
+    # the nodes needed by parse(), `tag` or `.class` (see dom_tree.parser.Parser)
+    # the DOM tree is built only for their subtrees if declared
+    targets = None
+
+    # the type of meta object returned by parse()
+    meta = Meta
+
+    def __init__(self, strict: bool = False, flat: bool = False):
         self._strict = strict  # should parse in strict mode?
-        self._parser = DOMTreeParser(strict)
+        self._parser = DOMTreeParser(strict, self.targets, index=True, flat=flat)  # flat: see DOMTreeParser
 
     def parse(self, content: str) -> Meta:
         """
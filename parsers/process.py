@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from parsers.parser import Meta, Parser
+
+from threading import Thread, Condition
+from multiprocessing import get_context
+from concurrent.futures import Future, ProcessPoolExecutor
+
+_parsers = {}  # {(parser class, strict): parser} of a worker process
+
+
+def _parse_batch(batch: list) -> list:
+    """
+    parse a batch of pages in worker process
+    :param batch: [(parser class, strict, content)]
+    :return: [meta dict or exception]
+    """
+
+    results = []
+    for cls, strict, content in batch:
+        parser = _parsers.get((cls, strict), None)
+        if parser is None:
+            parser = _parsers[(cls, strict)] = cls(strict)
+
+        try:
+            results.append(parser.parse(content).meta)
+        except Exception as e:
+            results.append(e)
+
+    return results
+
+
+class ProcessParser:
+    """
+    parse stage running in processes: pages are parsed out of the GIL of the crawling threads
+    and only the compact meta dicts are sent back, the pages are sent in batches of `batch_size`
+    (a batch not full is sent after `linger` seconds)
+    """
+
+    def __init__(self, processes: int = None, batch_size: int = 4, linger: float = 0.005):
+        """
+        initialization for parse stage
+        :param processes: the number of worker processes (the number of processors if None)
+        :param batch_size: max pages sent to a worker process at once
+        :param linger: max seconds a page waits for its batch to be full
+        """
+
+        self.batch_size = batch_size
+        self.linger = linger
+
+        # spawned (not forked) from a process running crawling threads
+        self._executor = ProcessPoolExecutor(processes, mp_context=get_context('spawn'))
+        self._batch = []  # [(parser, content, future)]
+        self._condition = Condition()
+        self._closed = False
+        self._flusher = Thread(target=self._flush_lingered, daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, parser: Parser, content: str) -> Future:
+        """
+        parse page content in worker processes
+        :param parser: the page parser (its class & mode are used by workers)
+        :param content: the raw html page content
+        :return: the future of Meta object
+        """
+
+        future = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Page rejected (parse stage closed)')
+
+            self._batch.append((parser, content, future))
+            if len(self._batch) >= self.batch_size:
+                self._send()
+            elif len(self._batch) == 1:
+                self._condition.notify()
+
+        return future
+
+    def parse(self, parser: Parser, content: str) -> Meta:
+        """
+        parse page content in worker processes and wait for the result
+        :param parser: the page parser (its class & mode are used by workers)
+        :param content: the raw html page content
+        """
+
+        return self.submit(parser, content).result()
+
+    def _send(self):
+        """
+        send the current batch to worker processes (called with condition held)
+        """
+
+        batch, self._batch = self._batch, []
+        items = [(parser.__class__, parser._strict, content) for parser, content, future in batch]
+
+        def done(f):
+            try:
+                results = f.result()
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (parser, content, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(parser.meta(**result))
+
+        self._executor.submit(_parse_batch, items).add_done_callback(done)
+
+    def _flush_lingered(self):
+        """
+        send the batches not full after `linger` seconds
+        """
+
+        with self._condition:
+            while not self._closed:
+                if not len(self._batch):
+                    self._condition.wait()
+                    continue
+
+                self._condition.wait(self.linger)
+                if len(self._batch):
+                    self._send()
+
+    def close(self):
+        """
+        send the pages left & shut down worker processes
+        """
+
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            if len(self._batch):
+                self._send()
+            self._condition.notify()
+
+        self._executor.shutdown()
+        self._flusher.join()
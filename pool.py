@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from threading import Thread
-from queue import Queue, Empty
+from threading import Thread, Lock, Condition
+from queue import Full
+from collections import deque
+from traceback import print_exc
+from typing import Iterable
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 
 
 class ThreadPool:
     """
-    a thread pool
+    a thread pool, all the scheduling state (workers, idle count, task queue) is guarded by one lock,
+    workers wait for tasks & producers wait for room with condition variables
     """
 
     class Worker(Thread):
@@ -22,77 +27,196 @@ class ThreadPool:
         def run(self):
 
             while True:
-                if (self._pool.state == ThreadPool.STATE_TERMINATED or
-                        (self._pool.state == ThreadPool.STATE_STOP and self._pool.tasks.empty())):
+                task = self._pool._take(self)
+                if task is None:
                     break
 
                 try:
-                    # get & run task
-                    self._pool.tasks.get(timeout=self._timeout)()
-                except Empty:
-                    self._pool.workers.remove(self)
-                    break
-                except:
-                    self._pool.workers.remove(self)
-                    raise
+                    task()
+                except Exception:
+                    # the worker survives the task failed (tasks by submit() never raise)
+                    print_exc()
 
     STATE_RUNNING = 0
     STATE_STOP = 1
     STATE_TERMINATED = 2
 
     def __init__(self, core_worker_num: int = 2, max_worker_num: int = 4,
-                 max_task_num: int = 0, live_timeout: float = None,
-                 qctr: Queue.__class__ = Queue):
+                 max_task_num: int = 0, live_timeout: float = None):
         """
         initialization for ThreadPool
         :param core_worker_num: the number of core worker threads (will be created immediately when a new task arrived)
         :param max_worker_num: max number of worker threads
-        :param max_task_num: max num of tasks could be accepted
-        :param live_timeout: time to live for worker thread when no task need to be processed (seconds)
-        :param qctr: Queue constructor for task queue
+        :param max_task_num: max num of tasks could be queued, put() & submit() block when the queue is full
+        :param live_timeout: time to live for the worker threads beyond core ones when no task need
+                             to be processed (seconds), never reclaimed if None
         """
 
         self.workers = []
         self.state = self.STATE_RUNNING
         self._timeout = live_timeout
-        self.tasks = qctr(max_task_num)
+        self._tasks = deque()  # the queued tasks (FIFO), guarded by the pool lock
+        self._max_task_num = max_task_num
         self._core_worker_num = core_worker_num
         self._max_worker_num = max_worker_num
 
+        self._lock = Lock()
+        self._not_empty = Condition(self._lock)  # notified when a task is queued (or the pool stops)
+        self._not_full = Condition(self._lock)  # notified when a task is taken (or the pool stops)
+        self._idle = 0  # workers waiting for tasks
+
     def put(self, task: callable, block: bool = True, timeout: float = None):
         """
         put a task into task queue
         :param task: target task
-        :param block: see Queue.put()
-        :param timeout: see Queue.put()
+        :param block: wait for room if the queue is full? (raises queue.Full if not)
+        :param timeout: max seconds to wait for room (raises queue.Full after it), forever if None
         """
 
-        if self.state != self.STATE_RUNNING:
-            raise RuntimeError('Task rejected (thread pool not running)')
+        with self._lock:
+            if self.state != self.STATE_RUNNING:
+                raise RuntimeError('Task rejected (thread pool not running)')
+
+            if self._full():
+                if not block or not self._not_full.wait_for(
+                        lambda: not self._full() or self.state != self.STATE_RUNNING, timeout):
+                    raise Full
+                if self.state != self.STATE_RUNNING:
+                    raise RuntimeError('Task rejected (thread pool not running)')
+
+            self._tasks.append(task)
+
+            # a new worker if the queued tasks are more than the idle workers could take
+            worker_num = len(self.workers)
+            if worker_num < self._core_worker_num or (len(self._tasks) > self._idle and
+                                                      worker_num < self._max_worker_num):
+                worker = ThreadPool.Worker(self._timeout, self)
+                self.workers.append(worker)
+                worker.start()
 
-        worker_num = len(self.workers)
-        if worker_num < self._core_worker_num or (not self.tasks.empty() and worker_num < self._max_worker_num):
-            worker = ThreadPool.Worker(self._timeout, self)
-            worker.start()
-            self.workers.append(worker)
+            self._not_empty.notify()
 
-        return self.tasks.put(task, block, timeout)
+    def _full(self) -> bool:
+        """
+        is the task queue full? (called with lock held)
+        """
+
+        return 0 < self._max_task_num <= len(self._tasks)
+
+    def _take(self, worker: Worker):
+        """
+        take a task for worker, waits until a task is queued
+        :param worker: the worker
+        :return: the task, None if the worker should exit
+        """
+
+        with self._lock:
+            while not len(self._tasks) or self.state == self.STATE_TERMINATED:
+                if self.state != self.STATE_RUNNING:
+                    self.workers.remove(worker)
+                    return None
+
+                self._idle += 1
+                woken = self._not_empty.wait(self._timeout)
+                self._idle -= 1
+
+                if not woken and not len(self._tasks) and len(self.workers) > self._core_worker_num:
+                    # idle for live_timeout, reclaimed
+                    self.workers.remove(worker)
+                    return None
+
+            task = self._tasks.popleft()
+            self._not_full.notify()
+
+            return task
+
+    def submit(self, fn: callable, *args, **kwargs) -> Future:
+        """
+        submit a task, fn(*args, **kwargs) will be run by a worker
+        :param fn: target function
+        :param args: positional arguments of fn
+        :param kwargs: keyword arguments of fn
+        :return: the future of fn result (or exception)
+        """
+
+        future = Future()
+
+        def task():
+            if not future.set_running_or_notify_cancel():
+                return  # cancelled
+
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self.put(task)
+
+        return future
+
+    def map(self, fn: callable, iterable: Iterable, ordered: bool = True, window: int = None):
+        """
+        run fn for each item of iterable, yields the results while the tasks finish
+        :param fn: target function
+        :param iterable: the items, submitted lazily
+        :param ordered: yields results in order of items (or in order of completion)?
+        :param window: max tasks in flight (2 * max_worker_num if None), items are not taken
+                       from iterable until a result is consumed
+        """
+
+        window = window or self._max_worker_num * 2
+        futures = deque()
+
+        try:
+            for item in iterable:
+                if len(futures) >= window:
+                    yield self._pop(futures, ordered)
+                futures.append(self.submit(fn, item))
+
+            while len(futures):
+                yield self._pop(futures, ordered)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _pop(futures: deque, ordered: bool):
+        """
+        wait for & pop a result of futures
+        :param futures: the futures in order of submitting
+        :param ordered: pop the first future (or the first finished one)?
+        """
+
+        if ordered:
+            return futures.popleft().result()
+
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        future = next(iter(done))
+        futures.remove(future)
+
+        return future.result()
 
     def stop(self):
         """
         stop the thread pool (wait for tasks finished)
         """
 
-        self.state = self.STATE_STOP
-        for i in range(len(self.workers) - 1, -1, -1):
-            self.workers[i].join()
-            del self.workers[i]
+        with self._lock:
+            self.state = self.STATE_STOP
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            workers = list(self.workers)
+
+        for worker in workers:
+            worker.join()
 
     def terminate(self):
         """
-        terminate the thread pool
+        terminate the thread pool (the tasks queued are dropped, the running ones are not interrupted)
         """
 
-        self.state = self.STATE_TERMINATED
-        for i in range(len(self.workers) - 1, -1, -1):
-            del self.workers[i]
+        with self._lock:
+            self.state = self.STATE_TERMINATED
+            self._tasks.clear()
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
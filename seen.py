@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from parsers.parser import Meta
+
+from time import time
+from typing import Iterable
+from hashlib import sha1
+from sqlite3 import connect
+from threading import Lock
+
+
+class SeenIndex:
+    """
+    persistent index (sqlite) of the crawled news urls with the content hash of each news,
+    shared by crawlers of different threads
+    """
+
+    def __init__(self, path: str):
+        """
+        initialization for index
+        :param path: the sqlite database path
+        """
+
+        self.path = path
+        self._lock = Lock()
+        self._connection = connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS news ('
+                                 'url TEXT PRIMARY KEY, hash TEXT NOT NULL, crawled_at REAL NOT NULL)')
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM news').fetchone()[0]
+
+    def __contains__(self, url: str):
+        return url in self.known((url,))
+
+    def known(self, urls: Iterable[str]) -> set:
+        """
+        the urls already in index
+        :param urls: urls to check
+        """
+
+        urls = list(urls)
+        known = set()
+
+        with self._lock:
+            # sqlite limits the number of parameters of a statement
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                cursor = self._connection.execute(
+                    f'SELECT url FROM news WHERE url IN ({",".join("?" * len(chunk))})', chunk)
+                known.update(url for url, in cursor)
+
+        return known
+
+    def hash(self, url: str):
+        """
+        the content hash of a crawled url, None if unknown
+        :param url: the url
+        """
+
+        with self._lock:
+            row = self._connection.execute('SELECT hash FROM news WHERE url = ?', (url,)).fetchone()
+
+        return row[0] if row is not None else None
+
+    def add(self, records: Iterable[tuple]):
+        """
+        add (or update) crawled news in one transaction
+        :param records: [(url, meta)] the crawled urls and their records
+        """
+
+        now = time()
+        rows = [(url, self.digest(meta), now) for url, meta in records]
+
+        with self._lock:
+            with self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO news (url, hash, crawled_at) VALUES (?, ?, ?)',
+                                             rows)
+
+    @staticmethod
+    def digest(meta: Meta) -> str:
+        """
+        the content hash of a record
+        :param meta: the record
+        """
+
+        content = '\0'.join(f'{k}={v}' for k, v in sorted(meta.meta.items()))
+        return sha1(content.encode('utf-8')).hexdigest()
+
+    def close(self):
+        """
+        close the database
+        """
+
+        with self._lock:
+            self._connection.close()
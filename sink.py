@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+from parsers.parser import Meta
+from journal import Journal
+
+from csv import writer
+from os import linesep, fsync
+from typing import Iterable, Union
+from itertools import count
+from threading import Lock
+
+
+class RecordSink:
+    """
+    thread-safe streaming sink of crawled records, the records are written page by page in
+    order of pages: a page finished early waits (in memory) only until the pages before it
+    are written, so no temp files or merging are needed
+    """
+
+    def __init__(self, path: str, columns: Iterable, start_page: int = 1, pages: Iterable = None):
+        """
+        initialization for sink
+        :param path: the output file path
+        :param columns: the record columns
+        :param start_page: the first page to be written
+        :param pages: the pages in order of writing (increasing), `start_page, start_page + 1, ...` if None
+        """
+
+        self.path = path
+        self.columns = tuple(columns)
+        self.ranges = []  # [(start page, end page, records)] written in order
+
+        self._pages = iter(pages) if pages is not None else count(start_page)
+        self._next = next(self._pages, float('inf'))  # the next page to be written
+        self._pending = {}  # {page: records} pages waiting for the pages before them
+        self._lock = Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, page: int, records: Iterable[Union[Meta, dict]]):
+        """
+        write the records of a page
+        :param page: page number
+        :param records: the records (meta objects or dicts) of page
+        """
+
+        rows = [self._row(r.meta if isinstance(r, Meta) else r) for r in records]
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Records rejected (sink closed)')
+            if page < self._next or page in self._pending:
+                raise AttributeError(f'page {page} was written already')
+
+            self._pending[page] = rows
+
+            while self._next in self._pending:
+                self._flush(self._next, self._pending.pop(self._next))
+                self._next = next(self._pages, float('inf'))
+
+    def skip(self, page: int):
+        """
+        mark a page done without records (e.g. failed) so the following pages are not held back
+        :param page: page number
+        """
+
+        self.write(page, ())
+
+    def close(self):
+        """
+        write the pages still waiting (in order, skipping the missing ones) and close the output
+        """
+
+        with self._lock:
+            if self._closed:
+                return
+
+            for page in sorted(self._pending):
+                self._flush(page, self._pending.pop(page))
+
+            self._closed = True
+            self._close()
+
+    def _row(self, record: dict) -> tuple:
+        """
+        convert a record to be a row
+        :param record: the record
+        """
+
+        return tuple(record.get(column, None) for column in self.columns)
+
+    def _flush(self, page: int, rows: list):
+        """
+        write the rows of a page to output
+        :param page: page number
+        :param rows: the rows
+        """
+
+        if len(self.ranges) and self.ranges[-1][1] == page - 1:
+            first, last, records = self.ranges[-1]
+            self.ranges[-1] = (first, page, records + len(rows))
+        else:
+            self.ranges.append((page, page, len(rows)))
+
+        if len(rows):
+            self._write_rows(rows)
+
+    def _write_rows(self, rows: list):
+        """
+        write rows to output
+        :param rows: the rows
+        """
+
+    def _close(self):
+        """
+        close the output
+        """
+
+
+class CsvSink(RecordSink):
+    """
+    record sink writing a csv file (the same format as DataFrame.to_csv(index=False)), the pages written
+    in order can be checkpointed into a journal, so a crawl died partway resumes from the last checkpoint
+    """
+
+    def __init__(self, path: str, columns: Iterable, start_page: int = 1, pages: Iterable = None,
+                 buffer_size: int = 1 << 20, journal: Journal = None, sync_every: int = 16, offset: int = None,
+                 failed: Iterable = ()):
+        """
+        initialization for csv sink
+        :param path: the output file path
+        :param columns: the record columns
+        :param start_page: the first page to be written
+        :param pages: see RecordSink
+        :param buffer_size: bytes of the write buffer
+        :param journal: checkpoint journal, `{"page": p, "offset": bytes, "failed": [pages]}` is appended when
+                        the pages until p are written to disk (the output is fsynced before the journal),
+                        the pages skipped (failed) are listed to be crawled again by a resumed crawl
+        :param sync_every: checkpoint every `sync_every` pages
+        :param offset: resume the output checkpointed at `offset` bytes (the rows after it are dropped)
+                       instead of writing a new one
+        :param failed: the pages failed before resuming, listed in the checkpoints until they are written
+        """
+
+        RecordSink.__init__(self, path, columns, start_page, pages)
+        self.sync_every = sync_every
+
+        self._journal = journal
+        self._last = start_page - 1  # the last page written in order
+        self._checkpointed = start_page - 1  # the last page checkpointed
+        self._unsynced = 0  # pages written after the last checkpoint
+        self._skipped = set()
+        self._failed = set(failed)  # pages failed (skipped in order, or not crawled again yet)
+        self._ordered = True  # no page missing before the pages written?
+
+        if offset is None:
+            self._file = open(path, 'w', encoding='utf-8', newline='', buffering=buffer_size)
+            self._writer = writer(self._file, lineterminator=linesep)
+            self._writer.writerow(self.columns)
+        else:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+            self._file = open(path, 'a', encoding='utf-8', newline='', buffering=buffer_size)
+            self._writer = writer(self._file, lineterminator=linesep)
+
+    def skip(self, page: int):
+        self._skipped.add(page)
+        RecordSink.skip(self, page)
+
+    def _flush(self, page: int, rows: list):
+        if page != self._next and self._ordered:
+            # the pages left are written with pages missing (by close()), not checkpointed
+            self._checkpoint()
+            self._ordered = False
+
+        RecordSink._flush(self, page, rows)
+
+        if self._ordered:
+            self._last = max(self._last, page)
+            if page in self._skipped:
+                self._failed.add(page)
+            else:
+                self._failed.discard(page)
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._checkpoint()
+
+    def _checkpoint(self):
+        """
+        write the output to disk and record the pages written in order done
+        """
+
+        if self._journal is None or not self._unsynced:
+            return
+
+        self._file.flush()
+        fsync(self._file.fileno())
+        self._checkpointed = max(self._checkpointed, self._last)
+        self._journal.append({'page': self._checkpointed, 'offset': self._file.tell(), 'failed': sorted(self._failed)})
+        self._unsynced = 0
+
+    def _write_rows(self, rows: list):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        if self._ordered:
+            self._checkpoint()
+        self._file.close()
+
+
+class ArrowSink(RecordSink):
+    """
+    record sink writing columnar chunks with pyarrow (optional dependency, imported when used),
+    rows are buffered and written as one chunk (row group / record batch) of `chunk_size` rows
+    """
+
+    def __init__(self, path: str, columns: Iterable, start_page: int = 1, chunk_size: int = 10000):
+        """
+        initialization for arrow sink
+        :param path: the output file path
+        :param columns: the record columns
+        :param start_page: the first page to be written
+        :param chunk_size: rows of each chunk
+        """
+
+        import pyarrow
+
+        RecordSink.__init__(self, path, columns, start_page)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in self.columns])
+        self._chunk_size = chunk_size
+        self._rows = []
+        self._writer = self._open()
+
+    def _open(self):
+        """
+        open the output writer
+        """
+
+    def _write_rows(self, rows: list):
+        self._rows.extend(rows)
+
+        while len(self._rows) >= self._chunk_size:
+            self._write_chunk(self._rows[:self._chunk_size])
+            del self._rows[:self._chunk_size]
+
+    def _write_chunk(self, rows: list):
+        """
+        write a chunk of rows (columns are built once for the chunk)
+        :param rows: the rows
+        """
+
+        columns = list(zip(*rows))
+        batch = self._pyarrow.record_batch([self._pyarrow.array(column, self._pyarrow.string()) for column in columns],
+                                           schema=self._schema)
+        self._writer.write_batch(batch)
+
+    def _close(self):
+        if len(self._rows):
+            self._write_chunk(self._rows)
+            self._rows = []
+
+        self._writer.close()
+
+
+class ParquetSink(ArrowSink):
+    """
+    record sink writing an Apache Parquet file, each chunk is a row group
+    """
+
+    def _open(self):
+        from pyarrow.parquet import ParquetWriter
+
+        return ParquetWriter(self.path, self._schema)
+
+
+class FeatherSink(ArrowSink):
+    """
+    record sink writing a Feather (v2, Arrow IPC) file, each chunk is a record batch
+    """
+
+    def _open(self):
+        from pyarrow.ipc import new_file
+
+        return new_file(self.path, self._schema)
+
+
+# output format -> (sink, file extension)
+SINKS = {
+    'csv': (CsvSink, 'csv'),
+    'parquet': (ParquetSink, 'parquet'),
+    'feather': (FeatherSink, 'feather'),
+}
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+from time import monotonic, sleep
+from threading import Lock, Condition
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    token bucket rate limiter, `rate` tokens per second are refilled up to `burst`
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1):
+        """
+        initialization for bucket
+        :param rate: tokens per second (no rate limit if None)
+        :param burst: max tokens kept
+        """
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._time = monotonic()  # the last refill time
+        self._until = 0  # paused until
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        take a token, waits until one is available (or the pause ends)
+        """
+
+        with self._lock:
+            now = monotonic()
+            wait = max(self._until - now, 0)
+
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._time) * self.rate)
+                self._time = now
+                # the token is reserved even if not refilled yet, the waiting callers are served in order
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+
+        if wait > 0:
+            sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        no token is given in the following seconds (e.g. told by `Retry-After`)
+        :param seconds: seconds to pause
+        """
+
+        with self._lock:
+            self._until = max(self._until, monotonic() + seconds)
+
+
+class AdaptiveLimit:
+    """
+    concurrency limit adapted in AIMD way: the limit grows by 1 per `limit` successful requests
+    (additive increase) and is halved by an error or throttling (multiplicative decrease, at most once
+    per latency window), optionally by a latency much higher than the best one seen too
+    """
+
+    def __init__(self, limit: int, minimum: int = 1, maximum: int = None, tolerance: float = None, slack: float = 0.05):
+        """
+        initialization for limit
+        :param limit: initial limit
+        :param minimum: min limit
+        :param maximum: max limit (`limit` if None)
+        :param tolerance: a latency higher than `tolerance` times of the best one (plus slack) is congested,
+                          latency is not regarded if None (pages of the same host may differ in latency a lot,
+                          e.g. a slow search page is not congestion)
+        :param slack: seconds of latency not regarded as congestion
+        """
+
+        self.limit = float(limit)
+        self.minimum = minimum
+        self.maximum = maximum or limit
+        self.tolerance = tolerance
+        self.slack = slack
+
+        self.in_flight = 0
+        self._latency = None  # smoothed latency
+        self._best = None  # the best smoothed latency
+        self._decreased = 0  # time of the last decrease
+        self._condition = Condition()
+
+    def acquire(self):
+        """
+        wait for a slot under the limit
+        """
+
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, ok: bool):
+        """
+        release a slot with the result of request
+        :param latency: seconds the request took
+        :param ok: was the request successful (not failed or throttled)?
+        """
+
+        with self._condition:
+            self.in_flight -= 1
+
+            self._latency = latency if self._latency is None else self._latency * 0.8 + latency * 0.2
+            self._best = self._latency if self._best is None else min(self._best, self._latency)
+
+            congested = self.tolerance is not None and self._latency > self._best * self.tolerance + self.slack
+            now = monotonic()
+            if not ok or congested:
+                if now - self._decreased >= self._latency:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._decreased = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+
+class HostLimiter:
+    """
+    per-host request limiter shared by crawlers: a token bucket (rate limit) and an adaptive
+    concurrency limit for each host
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1, concurrency: int = 16, min_concurrency: int = 1,
+                 tolerance: float = None):
+        """
+        initialization for limiter
+        :param rate: max requests per second of each host (no rate limit if None)
+        :param burst: max requests sent at once by rate limit
+        :param concurrency: max (and initial) requests in flight of each host
+        :param min_concurrency: min requests in flight of each host
+        :param tolerance: see AdaptiveLimit, the concurrency adapts to errors & throttling only if None
+        """
+
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.tolerance = tolerance
+
+        self._hosts = {}  # {host: (TokenBucket, AdaptiveLimit)}
+        self._lock = Lock()
+
+    def host(self, url: str) -> tuple:
+        """
+        the (TokenBucket, AdaptiveLimit) of url host
+        :param url: request url
+        """
+
+        host = urlsplit(url).netloc
+        limits = self._hosts.get(host, None)
+        if limits is None:
+            with self._lock:
+                limits = self._hosts.get(host, None)
+                if limits is None:
+                    limits = self._hosts[host] = (TokenBucket(self.rate, self.burst),
+                                                  AdaptiveLimit(self.concurrency, self.min_concurrency,
+                                                                tolerance=self.tolerance))
+
+        return limits
+
+    def acquire(self, url: str):
+        """
+        wait until a request to url is allowed
+        :param url: request url
+        """
+
+        bucket, limit = self.host(url)
+        limit.acquire()
+        bucket.acquire()
+
+    def release(self, url: str, latency: float, ok: bool, retry_after: float = None):
+        """
+        a request to url finished
+        :param url: request url
+        :param latency: seconds the request took
+        :param ok: was the request successful (not failed or throttled)?
+        :param retry_after: seconds the host asked to wait before the next request
+        """
+
+        bucket, limit = self.host(url)
+        if retry_after is not None:
+            bucket.pause(retry_after)
+        limit.release(latency, ok)